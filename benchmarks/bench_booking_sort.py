@@ -0,0 +1,53 @@
+"""
+Compare sorting bookings by pairwise ``humansorted`` calls (the old
+``BookingBase.__lt__``) with sorting by the cached ``BookingBase.sort_key``.
+
+Run with ``python benchmarks/bench_booking_sort.py [number_of_bookings]``
+"""
+
+import random
+import sys
+from functools import cmp_to_key
+from operator import attrgetter
+
+from natsort import humansorted
+from statement_generator import synthetic_bookings
+from timing import report
+
+
+def humansorted_cmp(first, second) -> int:
+    """Pairwise comparison like the old ``BookingBase.__lt__`` (bug fixed)"""
+    if first.date != second.date:
+        return -1 if first.date < second.date else 1
+    if first.payee != second.payee:
+        return -1 if humansorted([first.payee, second.payee])[0] == first.payee else 1
+    if first.comment == second.comment:
+        return 0
+    return -1 if humansorted([first.comment, second.comment])[0] == first.comment else 1
+
+
+def main(count: int = 100_000, repeat: int = 3):
+    bookings = list(synthetic_bookings(count))
+    random.Random(0).shuffle(bookings)
+
+    def before():
+        sorted(bookings, key=cmp_to_key(humansorted_cmp))
+
+    def after():
+        for booking in bookings:
+            booking._invalidate()
+        sorted(bookings, key=attrgetter("sort_key"))
+
+    def after_cached():
+        sorted(bookings, key=attrgetter("sort_key"))
+
+    for name, func in (
+        ("before (humansorted)", before),
+        ("after (computing keys)", after),
+        ("after (cached keys)", after_cached),
+    ):
+        report(f"{name:<24} {count:>8} bookings", func, repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,32 @@
+"""
+Compare the cost of iterating a large :class:`Bookings` collection.
+
+"before" emulates the old ``Bookings.__iter__`` that sorted the complete list on
+every iteration, "after" iterates the list that is kept sorted on insert.
+
+Run with ``python benchmarks/bench_bookings_iteration.py [number_of_bookings]``
+"""
+
+import sys
+
+from statement_generator import synthetic_bookings
+from timing import report
+
+
+def main(count: int = 100_000, repeat: int = 3):
+    bookings = synthetic_bookings(count)
+
+    def before():
+        for _ in sorted(list.__iter__(bookings)):
+            pass
+
+    def after():
+        for _ in bookings:
+            pass
+
+    for name, func in (("before (sort on iteration)", before), ("after", after)):
+        report(f"{name:<28} {count:>8} bookings", func, repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,29 @@
+"""
+Compare aggregating bookings in python with the numpy based BookingColumns.
+
+Run with ``python benchmarks/bench_columns.py [number_of_bookings]``
+"""
+
+import sys
+
+from statement_generator import synthetic_bookings
+from timing import report
+
+
+def main(count: int = 1_000_000, repeat: int = 3):
+    bookings = synthetic_bookings(count)
+    report(f"{'to_columns':<28} {count:>8} bookings", bookings.to_columns, 1)
+    columns = bookings.to_columns()
+
+    for name, func in (
+        ("sum_by_payee (python)", bookings.sum_by_payee),
+        ("sum_by_payee (columns)", columns.sum_by_payee),
+        ("sum_by_category (python)", bookings.sum_by_category),
+        ("sum_by_category (columns)", columns.sum_by_category),
+        ("sum_by month (columns)", lambda: columns.sum_by("month")),
+    ):
+        report(f"{name:<28} {count:>8} bookings", func, repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,91 @@
+"""
+Compare the old csv reader building a dict per row with reading the rows by position.
+
+Also shows the peak memory of streaming the bookings in batches compared to
+reading them all with ``csv2bookings``.
+
+Run with ``python benchmarks/bench_csv.py [number_of_bookings]``
+"""
+
+import csv
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from statement_generator import write_statement
+from timing import report
+
+from bank_statement_reader import Booking, csv2bookings, iter_booking_batches
+from bank_statement_reader.parsing import parse_german_number
+from bank_statement_reader.statement_reader import iter_csv_bookings
+
+
+def old_iter_csv_bookings(filename):
+    headers = list()
+    ignored_lines = list()
+    ignore_rest = False
+    with open(filename, newline="", encoding="latin-1") as csvfile:
+        for row in csv.reader(csvfile, delimiter=";", quotechar='"'):
+            if ignore_rest:
+                ignored_lines.append(";".join(row))
+            elif len(headers) > 1:
+                if len(row) != len(headers):
+                    ignore_rest = True
+                    ignored_lines.append(";".join(row))
+                    continue
+                result = dict()
+                booking = Booking()
+                for cell, header in zip(row, headers):
+                    result[header] = cell
+                comment = result.get("Vorgang/Verwendungszweck").split("\n")
+                booking.comment = "\n".join(comment[1:])
+                booking.date = result.get("Buchungstag")
+                booking.type = comment[0]
+                multiply = -1 if result.get("HS") == "S" else 1
+                booking.amount = parse_german_number(result.get("Umsatz")) * multiply
+                booking.payee = result.get("Empfänger/Zahlungspflichtiger")
+                yield booking
+            elif len(row) > 0 and row[0] == "Buchungstag":
+                for cell in row:
+                    headers.append(cell)
+                    if cell == "Umsatz":
+                        headers.append("HS")
+                        break
+
+
+def _count(bookings) -> int:
+    return sum(1 for _ in bookings)
+
+
+def _peak(func) -> int:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(count: int = 100_000, repeat: int = 3):
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_statement(Path(directory) / "statement.csv", count, "csv")
+        old = [str(b) for b in old_iter_csv_bookings(path)]
+        assert old == [str(b) for b in iter_csv_bookings(path)]
+        for name, func in (
+            ("dict per row", lambda: _count(old_iter_csv_bookings(path))),
+            ("by position", lambda: _count(iter_csv_bookings(path))),
+        ):
+            report(f"{name:<20} {count:>8} bookings", func, repeat)
+        for name, func in (
+            ("csv2bookings", lambda: csv2bookings(path)),
+            (
+                "batches of 1000",
+                lambda: _count(iter_booking_batches(iter_csv_bookings(path), 1000)),
+            ),
+        ):
+            peak = _peak(func)
+            print(f"{name:<20} {count:>8} bookings: {peak / 2 ** 20:10.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,50 @@
+"""
+Compare the old html table and repr built by repeated concatenation with the
+joined and paginated rendering.
+
+Run with ``python benchmarks/bench_html.py [number_of_bookings]``
+"""
+
+import sys
+
+from statement_generator import synthetic_bookings
+from timing import report
+
+
+def old_html_table(bookings) -> str:
+    result = (
+        "<table class='table_basic'>"
+        "<tr><th>Date</th><th>Category</th><th>Type</th>"
+        "<th>Amount</th><th>Payee</th><th>Comment</th></tr>"
+    )
+    for i in bookings:
+        result = f"{result}\n<tr>{i._tr_}</tr>"
+    return f"{result}</table>"
+
+
+def old_repr(bookings) -> str:
+    result = " [\n"
+    for itm in bookings:
+        result += "  " + repr(itm) + "\n"
+    return result + "]"
+
+
+def main(count: int = 20_000, repeat: int = 3):
+    bookings = synthetic_bookings(count)
+    # the categories are cached, compute them before to time the rendering only
+    assert old_html_table(bookings) == bookings.html_filter_entry_without_category(
+        False
+    )
+    for name, func in (
+        ("table before", lambda: old_html_table(bookings)),
+        ("table after", lambda: bookings.html_filter_entry_without_category(False)),
+        ("_repr_html_", bookings._repr_html_),
+        ("page 100", lambda: bookings.page(100)._repr_html_()),
+        ("repr before", lambda: old_repr(bookings)),
+        ("repr after", lambda: repr(bookings)),
+    ):
+        report(f"{name:<15} {count:>8} bookings", func, repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,48 @@
+"""
+Measure how long importing the package and its command line interface takes.
+
+Uses ``python -X importtime`` in fresh interpreters and prints the total import
+time of each module as well as the slowest modules imported with it.
+
+Run with ``python benchmarks/bench_import.py [repeat]``
+"""
+
+import subprocess
+import sys
+from typing import Dict
+
+MODULES = ["bank_statement_reader", "bank_statement_reader.cli"]
+HEAVY = ("pdfminer", "schwifty", "natsort", "numpy")
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module imported"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(repeat: int = 5):
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(repeat)]
+        best = min(runs, key=lambda times: times[module])
+        heavy = sorted(name for name in best if name.split(".")[0] in HEAVY)
+        print(f"{module:<28} {best[module] / 1000:8.2f} ms")
+        slowest = sorted(best.items(), key=lambda item: item[1], reverse=True)[1:6]
+        for name, cumulative in slowest:
+            print(f"    {name:<36} {cumulative / 1000:8.2f} ms")
+        if heavy:
+            print(f"    heavy dependencies imported: {', '.join(heavy)}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
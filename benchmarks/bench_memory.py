@@ -0,0 +1,87 @@
+"""
+Compare the memory needed to keep many bookings.
+
+"before" emulates the old bookings with an instance dict and own type and payee
+strings per booking, "slots" uses the current `Booking` with `__slots__` and
+interned strings and "records" the parallel arrays of `BookingRecords`.
+
+Run with ``python benchmarks/bench_memory.py [number_of_bookings]``
+"""
+
+import random
+import sys
+import tracemalloc
+from datetime import date, timedelta
+
+from bank_statement_reader import Booking, BookingRecords
+
+PAYEES = ["REWE Markt", "Stadtwerke", "Max Mustermann", "Deutsche Bahn", "Vermieter"]
+TYPES = ["Überweisungsauftrag", "Lastschrift", "Dauerauftrag"]
+
+
+class DictBooking:
+    """The attributes the old `BookingBase` kept in its instance dict"""
+
+    def __init__(self, day, type_, amount, payee, comment):
+        self._type = type_
+        self._date = day
+        self.amount = amount
+        self._iban = None
+        self._wrong_type = None
+        self._comment = comment
+        self._payee = payee
+
+
+def rows(count: int, seed: int = 42):
+    rnd = random.Random(seed)
+    day = date(2010, 1, 1)
+    for i in range(count):
+        if i % 30 == 0:
+            day += timedelta(days=1)
+        # build new strings, like parsing every statement line does
+        yield (
+            day,
+            "".join(rnd.choice(TYPES)),
+            round(rnd.uniform(-500, 500), 2),
+            "".join(rnd.choice(PAYEES)),
+            f"Rechnung {rnd.randrange(10_000)}",
+        )
+
+
+def before(count):
+    return [DictBooking(*row) for row in rows(count)]
+
+
+def slots(count):
+    return [
+        Booking.from_record(day, type_, amount, payee, comment)
+        for day, type_, amount, payee, comment in rows(count)
+    ]
+
+
+def records(count):
+    return BookingRecords(
+        Booking.from_record(day, type_, amount, payee, comment)
+        for day, type_, amount, payee, comment in rows(count)
+    )
+
+
+def main(count: int = 1_000_000):
+    for name, func in (
+        ("before (dict)", before),
+        ("slots", slots),
+        ("records", records),
+    ):
+        tracemalloc.start()
+        result = func(count)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        print(
+            f"{name:<16} {count:>8} bookings: "
+            f"{current / 1024**2:8.1f} MiB kept, {peak / 1024**2:8.1f} MiB peak"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
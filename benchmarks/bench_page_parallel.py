@@ -0,0 +1,44 @@
+"""
+Compare reading a long PDF statement at once and with parallel page workers.
+
+The whole `pdf2bookings` call is timed without a cache, so the fingerprint and
+the parsing that run before and after the parallel extraction are included.
+
+Run with ``python benchmarks/bench_page_parallel.py statement.pdf [extractor]``
+"""
+
+import os
+import sys
+
+from timing import report
+
+from bank_statement_reader import pdf2bookings
+from bank_statement_reader.extraction import ExtractorSelector, pdf_page_count
+
+
+def _selector(extractor: str) -> ExtractorSelector:
+    """A selector trying only extractor"""
+    selector = ExtractorSelector()
+    selector.ORDER = (extractor,)
+    return selector
+
+
+def main(filepath: str, extractor: str = "pdfminer", repeat: int = 3):
+    print(f"{filepath}: {pdf_page_count(filepath)} pages, {os.cpu_count()} cpus")
+
+    def read(workers=None):
+        return pdf2bookings(
+            filepath, selector=_selector(extractor), page_workers=workers
+        )
+
+    single = [str(b) for b in read()]
+    report(f"{'single pass':<20}", read, repeat)
+    workers = 2
+    while workers <= max(2, os.cpu_count() or 1):
+        assert [str(b) for b in read(workers)] == single
+        report(f"{f'{workers} workers':<20}", lambda: read(workers), repeat)
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
@@ -0,0 +1,61 @@
+"""
+Compare the old amount and date parsing with the memoised and vectorised parsers.
+
+Run with ``python benchmarks/bench_parsing.py [number_of_values]``
+"""
+
+import datetime
+import random
+import sys
+
+from timing import report
+
+from bank_statement_reader.parsing import (
+    parse_amount_string,
+    parse_amounts,
+    parse_date,
+    parse_dates,
+)
+
+
+def old_parse_amount_string(amount: str) -> float:
+    amount = amount.replace("H", "+").replace("S", "-")
+    amount = amount.replace(".", "")
+    amount = amount.replace(",", ".")
+    amount = amount[-1] + amount[:-1].strip()
+    return float(amount)
+
+
+def old_parse_date(value: str) -> datetime.date:
+    return datetime.datetime.strptime(value, "%d.%m.%Y").date()
+
+
+def main(count: int = 1_000_000, repeat: int = 3):
+    rnd = random.Random(42)
+    start = datetime.date(2010, 1, 1)
+    dates = [
+        f"{start + datetime.timedelta(days=rnd.randrange(3650)):%d.%m.%Y}"
+        for _ in range(count)
+    ]
+    amounts = [
+        f"{rnd.randrange(1_000_000) / 100:_.2f}".replace(".", ",").replace("_", ".")
+        + rnd.choice(["   S", "   H", "-", "+"])
+        for _ in range(count)
+    ]
+
+    for name, func in (
+        ("dates strptime", lambda: [old_parse_date(d) for d in dates]),
+        ("dates parse_date", lambda: [parse_date(d) for d in dates]),
+        ("dates parse_dates (numpy)", lambda: parse_dates(dates)),
+        ("amounts old", lambda: [old_parse_amount_string(a) for a in amounts]),
+        (
+            "amounts parse_amount_string",
+            lambda: [parse_amount_string(a) for a in amounts],
+        ),
+        ("amounts parse_amounts (numpy)", lambda: parse_amounts(amounts)),
+    ):
+        report(f"{name:<30} {count:>8} values", func, repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,50 @@
+"""
+Compare reading PDF statements with and without pre-scanning their pages.
+
+The pre-scan interprets every page once more to skip the layout analysis of
+pages without bookings. It pays off only if enough pages can be skipped, i.e.
+terms and conditions attached to a long statement, and costs time otherwise.
+The whole `pdf2bookings` call is timed without a cache.
+
+Run with ``python benchmarks/bench_prescan.py [number_of_bookings]``
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from statement_generator import write_pdf_statement
+from timing import report
+
+from bank_statement_reader import pdf2bookings
+from bank_statement_reader.extraction import ExtractorSelector, pdf_page_count
+
+
+def _read(path: Path, prescan: bool):
+    selector = ExtractorSelector()
+    selector.ORDER = ("pdfminer",)
+    return pdf2bookings(path, selector=selector, prescan=prescan)
+
+
+def main(count: int = 250, repeat: int = 3):
+    with tempfile.TemporaryDirectory() as directory:
+        for name, bookings, terms_pages in (
+            ("short", count // 5, 0),
+            ("bookings only", count, 0),
+            ("with terms", count, count // 10),
+        ):
+            path = Path(directory) / f"{name}.pdf"
+            write_pdf_statement(path, bookings, terms_pages)
+            expected = [str(b) for b in _read(path, prescan=False)]
+            assert [str(b) for b in _read(path, prescan=True)] == expected
+            pages = pdf_page_count(path)
+            for prescan in (False, True):
+                report(
+                    f"{name:<14} {pages:>4} pages, prescan {prescan!s:<5}",
+                    lambda: _read(path, prescan),
+                    repeat,
+                )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
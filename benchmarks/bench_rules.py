@@ -0,0 +1,139 @@
+"""
+Compare the old payee and category if/elif chains with the compiled rules.
+
+"before" emulates the old ``_set_payee`` and ``_get_category`` that looped over
+all payee lists and compared lowered strings one by one, "after" uses the rules
+compiled once per booking class.
+
+Run with ``python benchmarks/bench_rules.py [number_of_payees]``
+"""
+
+import random
+import sys
+
+from timing import report
+
+from bank_statement_reader import Booking
+
+PAYEES = [
+    "REWE Markt GmbH",
+    "Stadtwerke Musterstadt",
+    "Max Mustermann",
+    "DB Vertrieb GmbH",
+    "Vermieter",
+    "PayPal Europe S.a.r.l.",
+    "DM Fil. 1234",
+    "Stern-Apotheke",
+    "Filiale Frischemarkt Nord",
+    "Thalia Buchhandlung",
+]
+COMMENTS = ["Rechnung 1234", "Miete Mai", "Spotify Premium", "Ingenico ROSS", ""]
+
+
+class LegacyBooking(Booking):
+    def _set_payee(self, value: str):
+        beginnings = self.payee_prefixes
+        contains = self.payee_contains
+        paypals = self.paypal_payees
+
+        for beginn in beginnings:
+            if value.lower().strip().startswith(beginn.lower()):
+                self._payee = beginn.strip()
+                return
+
+        for key, val in contains.items():
+            if key.lower() in value.lower():
+                self._payee = val
+                return
+
+        if value.startswith("PayPal"):
+            self._type = "PayPal"
+            self._payee = None
+            for key, val in paypals.items():
+                if key.lower() in self.comment.lower():
+                    self._payee = val
+                    break
+            if self._payee is None:
+                self._payee = "PayPal"
+        elif value.upper().startswith("DM FIL"):
+            self._payee = "DM"
+        elif "ingenico" in value.lower() and "ross" in self.comment.lower():
+            self._payee = "Rossmann"
+        else:
+            self._payee = value
+
+    def _get_category(self) -> str:
+        insurances = ["IKK", "Allianz", "DEBEKA"]
+        newspaper = ["TAZ", "Stiftung Warentest"]
+        grocery = [
+            "Combi",
+            "EDEKA",
+            "AKTIV UND IRMA",
+            "REWE",
+            "Denns",
+            "Superbiomarkt",
+            "LIDL",
+        ]
+        anschaffung_sonstig = ["PayPal", "AMAZON", "Pollin", "Saturn", "Reichelt"]
+        if self.type == "Bargeldabhebung":
+            return "Cash Withdrawal"
+        elif self.type == "Kontogebühren":
+            return "Financial expenses > Bank charges"
+        elif "GLS Beitrag" in self.comment:
+            self.type = "Kontogebühren"
+            return "Financial expenses > Bank charges"
+        elif self.type == "Gehalt":
+            return "Einnahmen > Gehalt"
+        elif self.payee in insurances:
+            return "Insurance"
+        elif self.payee in grocery:
+            return "Nahrung > Grocery"
+        elif self.payee in anschaffung_sonstig:
+            return "Anschaffungen > Sonstiges"
+        elif self.payee == "KFW":
+            return "Loan"
+        elif self.payee == "DB":
+            return "Transport > Train"
+        elif self.payee == "Spotify":
+            return "Leisures > Music"
+        elif self.payee == "Mudjeans":
+            return "Care > Clothing"
+        elif self.payee == "DM" or self.payee == "Rossmann":
+            return "Care > Careproducts"
+        elif "APOTHEKE" in self.payee.upper():
+            return "Health > Chemist"
+        elif self.payee in newspaper:
+            return "Education > Newspaper"
+        elif self.payee == "Thalia":
+            return "Education > Books"
+        elif "miete" in self.comment.lower():
+            return "Miete"
+        else:
+            return "Unknown"
+
+
+def classify(cls, rows):
+    result = []
+    for payee, comment in rows:
+        booking = cls()
+        booking._type = "Überweisungsauftrag"
+        booking._comment = comment
+        booking.payee = payee
+        result.append((booking.payee, booking.category))
+    return result
+
+
+def main(count: int = 100_000, repeat: int = 3):
+    rnd = random.Random(42)
+    rows = [
+        (f"{rnd.choice(PAYEES)} {rnd.randrange(100)}", rnd.choice(COMMENTS))
+        for _ in range(count)
+    ]
+    assert classify(LegacyBooking, rows) == classify(Booking, rows)
+
+    for name, cls in (("before (if/elif chains)", LegacyBooking), ("after", Booking)):
+        report(f"{name:<28} {count:>8} payees", lambda: classify(cls, rows), repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,78 @@
+"""
+Compare the old line by line parsing of statement texts with the single pass scanner.
+
+"before" emulates the old ``pdf2data_and_year`` that split the text into lines,
+matched every line in Python and searched the year separately, followed by
+``data2booking`` matching the booking lines once more. "after" finds the
+bookings, their fields and the year with one ``finditer`` over the whole text.
+
+Run with ``python benchmarks/bench_scanner.py [number_of_bookings]``
+"""
+
+import sys
+
+from statement_generator import statement_text
+from timing import report
+
+from bank_statement_reader import Bookings
+from bank_statement_reader.statement_reader import (
+    RE_BOOKING_LINE_START,
+    RE_SEPARATOR_LINE,
+    _text2bookings,
+    data2booking,
+    extract_year,
+    pdf2data_and_year,
+)
+
+
+def old_iter_booking_lines(text: str):
+    beginning_found = False
+    for line in text.splitlines():
+        do_append = False
+        if RE_BOOKING_LINE_START.match(line) is not None:
+            beginning_found = True
+            do_append = True
+            line = line.strip()
+        elif beginning_found and len(line) > 0 and line[0] == " ":
+            if RE_SEPARATOR_LINE.fullmatch(line) is None:
+                do_append = True
+            else:
+                beginning_found = False
+        else:
+            beginning_found = False
+            do_append = False
+        if do_append:
+            yield line.rstrip()
+
+
+def old_pdf2data_and_year(text: str, filepath: str):
+    year = extract_year(text, filepath)
+    return list(old_iter_booking_lines(text)), year
+
+
+def old_text2bookings(text: str, filepath: str) -> Bookings:
+    data, year = old_pdf2data_and_year(text, filepath)
+    return data2booking(data, year)
+
+
+def new_text2bookings(text: str, filepath: str) -> Bookings:
+    return _text2bookings(text, extract_year(text, filepath), filepath)
+
+
+def main(count: int = 10_000, repeat: int = 3):
+    for layout in ("gls", "triodos"):
+        text = statement_text(count, layout=layout)
+        assert old_pdf2data_and_year(text, "x") == pdf2data_and_year(text, "x")
+        old = [str(b) for b in old_text2bookings(text, "x")]
+        assert old == [str(b) for b in new_text2bookings(text, "x")]
+        for name, func in (
+            ("lines before", lambda: old_pdf2data_and_year(text, "x")),
+            ("lines after", lambda: pdf2data_and_year(text, "x")),
+            ("bookings before", lambda: old_text2bookings(text, "x")),
+            ("bookings after", lambda: new_text2bookings(text, "x")),
+        ):
+            report(f"{layout:<8} {name:<16} {count:>8} bookings", func, repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
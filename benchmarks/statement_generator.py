@@ -0,0 +1,273 @@
+"""
+Generate realistic synthetic statements for benchmarks.
+
+Statements are rendered like ``pdftotext -layout`` extracts the GLS (two dates,
+``H``/``S`` sign) and the old Triodos/GLS reports (one date, ``+``/``-`` sign),
+or like the csv export ``csv2bookings`` reads.
+
+Use ``python benchmarks/statement_generator.py gls|triodos|csv COUNT OUT`` to
+write a statement to a file.
+"""
+
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+from bank_statement_reader import Booking, Bookings
+
+TYPES = [
+    "Überweisungsauftrag",
+    "Überweisungsgutschr.",
+    "SEPA-Basislastschrift",
+    "Kartenzahlung girocard",
+    "Dauerauftrag",
+    "Auszahlung girocard",
+    "Lohn/Gehalt/Rente",
+]
+PAYEES = [
+    "REWE Markt GmbH",
+    "EDEKA Frischemarkt",
+    "Stadtwerke Musterstadt",
+    "Max Mustermann",
+    "DB Vertrieb GmbH",
+    "Hausverwaltung Schmidt",
+    "PayPal Europe S.a.r.l. et Cie S.C.A",
+    "DM Fil. 1234",
+    "Stern-Apotheke",
+    "Allianz Versicherungs-AG",
+]
+WORDS = [
+    "Rechnung",
+    "Miete",
+    "Einkauf",
+    "Abschlag",
+    "Beitrag",
+    "Kundennummer",
+    "Vertrag",
+    "Danke",
+    "EREF:",
+    "MREF:",
+]
+BOOKINGS_PER_PAGE = 25
+LINE_WIDTH = 78
+
+
+class SyntheticBooking(NamedTuple):
+    day: date
+    type: str
+    amount: float
+    payee: str
+    comment: List[str]
+
+
+def synthetic_rows(
+    count: int, seed: int = 42, year: int = 2020
+) -> Iterator[SyntheticBooking]:
+    """Bookings spread evenly over the year, with one to four comment lines"""
+    rnd = random.Random(seed)
+    per_day = max(1, count // 365 + 1)
+    for i in range(count):
+        comment = [
+            " ".join(rnd.choice(WORDS) for _ in range(rnd.randrange(2, 6))) + f" {i}"
+            for _ in range(rnd.randrange(1, 5))
+        ]
+        yield SyntheticBooking(
+            day=date(year, 1, 1) + timedelta(days=min(i // per_day, 364)),
+            type=rnd.choice(TYPES),
+            amount=round(rnd.uniform(0.01, 2500), 2),
+            payee=rnd.choice(PAYEES),
+            comment=comment,
+        )
+
+
+def _german_number(value: float) -> str:
+    return f"{value:_.2f}".replace(".", ",").replace("_", ".")
+
+
+def _sign(i: int) -> bool:
+    """Whether the i-th booking is a credit"""
+    return i % 5 == 0
+
+
+def statement_text(
+    count: int, seed: int = 42, year: int = 2020, layout: str = "gls"
+) -> str:
+    """
+    Text of a statement with count bookings as `pdftotext -layout` extracts it
+
+    :param layout: "gls" for the current GLS layout with two dates and H/S signs,
+                   "triodos" for the old layout with one date and +/- signs
+    """
+    if layout not in ("gls", "triodos"):
+        raise ValueError(f"Unknown layout '{layout}'")
+    lines = []
+    page = 0
+    for i, row in enumerate(synthetic_rows(count, seed, year)):
+        if i % BOOKINGS_PER_PAGE == 0:
+            page += 1
+            if i:
+                lines += ["", "   " + "_" * (LINE_WIDTH - 3), "Übertrag", "\f"]
+            lines += [
+                f"GLS Gemeinschaftsbank eG{'Kontoauszug':>42} {page}/{year}",
+                f"Max Mustermann{'erstellt am':>43} 31.12.{year}",
+                "",
+                f"Bu-Tag  Wert   Vorgang{'Betrag EUR':>56}",
+            ]
+        credit = _sign(i)
+        if layout == "gls":
+            start = f"{row.day:%d.%m.}  {row.day:%d.%m.} {row.type}"
+            amount = f"{_german_number(row.amount)} {'H' if credit else 'S'}"
+        else:
+            start = f"{row.day:%d.%m.}   {row.type}"
+            amount = f"{_german_number(row.amount)}{'+' if credit else '-'}"
+        lines.append(f"{start}{amount:>{LINE_WIDTH - len(start)}}")
+        indent = " " * 15
+        lines.append(f"{indent}{row.payee}")
+        lines += [f"{indent}{comment}" for comment in row.comment]
+    lines += [
+        "   " + "_" * (LINE_WIDTH - 3),
+        f"{'neuer Kontostand':>60}{'1.000,00 H':>18}",
+        "Anlage zum Kontoauszug",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def statement_csv(count: int, seed: int = 42, year: int = 2020) -> str:
+    """A statement with count bookings in the format of the GLS csv export"""
+    header = [
+        "Buchungstag",
+        "Valuta",
+        "Empfänger/Zahlungspflichtiger",
+        "IBAN",
+        "BIC",
+        "Vorgang/Verwendungszweck",
+        "Währung",
+        "Umsatz",
+        "",
+    ]
+    lines = ["Umsätze;;;;;;;;", ";;;;;;;;", ";".join(header)]
+    for i, row in enumerate(synthetic_rows(count, seed, year)):
+        day = f"{row.day:%d.%m.%Y}"
+        purpose = "\n".join([row.type] + row.comment)
+        lines.append(
+            f"{day};{day};{row.payee};DE02430609670000000000;GENODEM1GLS;"
+            f'"{purpose}";EUR;{_german_number(row.amount)};{"H" if _sign(i) else "S"}'
+        )
+    lines += ["", "Kontostand;1.000,00;H", ""]
+    return "\n".join(lines)
+
+
+def write_statement(path: Path, count: int, layout: str = "gls", seed: int = 42):
+    """Write a csv (layout "csv") or text statement readable by `files2booking`"""
+    if layout == "csv":
+        path.write_text(statement_csv(count, seed), encoding="latin-1")
+    else:
+        path.write_text(statement_text(count, seed, layout=layout), encoding="UTF-8")
+    return path
+
+
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("cp1252")
+
+
+def pdf_bytes(
+    pages: List[List[str]], encoding: Optional[str] = "WinAnsiEncoding"
+) -> bytes:
+    """
+    A PDF with one line of Courier text per entry of the pages' lines
+
+    :param encoding: of the font, without one pdfminer can't decode umlauts
+    """
+    font = b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier"
+    if encoding is not None:
+        font += b" /Encoding /%s" % encoding.encode("ascii")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # the page tree, once the page objects are known
+        font + b" >>",
+    ]
+    kids = []
+    for lines in pages:
+        content = b"".join(
+            b"BT /F1 8 Tf 30 %d Td (%s) Tj ET\n"
+            % (810 - 10 * number, _pdf_string(line))
+            for number, line in enumerate(lines)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(kids),
+        len(kids),
+    )
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return pdf
+
+
+def terms_page(seed: int = 42) -> List[str]:
+    """Lines of a page without bookings, like attached terms and conditions"""
+    rnd = random.Random(seed)
+    return [
+        " ".join(rnd.choice(WORDS) for _ in range(12))
+        for _ in range(BOOKINGS_PER_PAGE * 3)
+    ]
+
+
+def write_pdf_statement(
+    path: Path, count: int, terms_pages: int = 0, seed: int = 42
+) -> Path:
+    """
+    Write a PDF statement in the GLS layout with count bookings, followed by
+    terms_pages pages without bookings
+    """
+    pages = [
+        page.strip("\n").splitlines()
+        for page in statement_text(count, seed).split("\f")
+    ]
+    pages += [terms_page(seed + number) for number in range(terms_pages)]
+    path.write_bytes(pdf_bytes(pages))
+    return path
+
+
+def synthetic_bookings(count: int, seed: int = 42) -> Bookings:
+    """Bookings created from the synthetic rows without reading a statement"""
+    bookings = Bookings()
+    bookings.extend(
+        (
+            Booking.from_record(
+                date=row.day,
+                type=Booking.type_convert[row.type],
+                amount=row.amount if _sign(i) else -row.amount,
+                payee=row.payee,
+                comment=" ".join(row.comment),
+            )
+            for i, row in enumerate(synthetic_rows(count, seed))
+        ),
+        ignore_duplicates=False,
+    )
+    return bookings
+
+
+if __name__ == "__main__":
+    layout, count, out = sys.argv[1], int(sys.argv[2]), Path(sys.argv[3])
+    write_statement(out, count, layout)
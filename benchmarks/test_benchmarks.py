@@ -0,0 +1,131 @@
+"""
+Benchmarks of each stage of reading statements, using pytest-benchmark.
+
+Run with ``pytest benchmarks/ --no-cov`` after installing
+``pip install bank_statement_reader[benchmark]``. The sizes default to 100, 1k
+and 10k bookings, set ``BENCHMARK_SIZES=100,1000000`` to use others.
+"""
+
+import os
+from functools import lru_cache
+
+import pytest
+from statement_generator import (
+    statement_text,
+    synthetic_bookings,
+    write_statement,
+)
+
+from bank_statement_reader import Bookings
+from bank_statement_reader.statement_reader import (
+    csv2bookings,
+    data2booking,
+    iter_text_bookings,
+    pdf2data_and_year,
+)
+
+SIZES = [
+    int(size) for size in os.environ.get("BENCHMARK_SIZES", "100,1000,10000").split(",")
+]
+
+pytestmark = pytest.mark.parametrize("size", SIZES)
+
+
+@lru_cache(maxsize=None)
+def _text(size: int, layout: str) -> str:
+    return statement_text(size, layout=layout)
+
+
+@lru_cache(maxsize=None)
+def _data(size: int):
+    return pdf2data_and_year(_text(size, "gls"), "synthetic")
+
+
+@lru_cache(maxsize=None)
+def _bookings(size: int) -> Bookings:
+    return synthetic_bookings(size)
+
+
+def _pedantic(benchmark, func, setup=None):
+    """Run expensive benchmarks only a few times"""
+    return benchmark.pedantic(func, setup=setup, rounds=3, warmup_rounds=0)
+
+
+@pytest.mark.parametrize("layout", ["gls", "triodos"])
+def test_pdf2data_and_year(benchmark, size, layout):
+    text = _text(size, layout)
+    data, year = benchmark(pdf2data_and_year, text, "synthetic")
+    assert year == "2020"
+
+
+def test_data2booking(benchmark, size):
+    data, year = _data(size)
+    bookings = _pedantic(benchmark, lambda: data2booking(data, year))
+    assert len(bookings) == size
+
+
+def test_iter_text_bookings(benchmark, size):
+    text = _text(size, "gls")
+    bookings = _pedantic(benchmark, lambda: list(iter_text_bookings(text, "2020")))
+    assert len(bookings) == size
+
+
+def test_csv2bookings(benchmark, size, tmp_path):
+    path = write_statement(tmp_path / "statement.csv", size, "csv")
+    bookings = _pedantic(benchmark, lambda: csv2bookings(path))
+    assert len(bookings) == size
+
+
+def test_append_with_dedupe(benchmark, size):
+    bookings = list(_bookings(size))
+
+    def append_all():
+        result = Bookings()
+        for booking in bookings:
+            result.append(booking)
+        return result
+
+    result = _pedantic(benchmark, append_all)
+    assert len(result) == size
+
+
+def test_add(benchmark, size):
+    bookings = _bookings(size)
+    first, second = Bookings(), Bookings()
+    first.extend(bookings[::2], ignore_duplicates=False)
+    second.extend(bookings[1::2], ignore_duplicates=False)
+    result = _pedantic(benchmark, lambda: first + second)
+    assert len(result) == size
+
+
+def test_save(benchmark, size, tmp_path):
+    bookings = _bookings(size)
+    _pedantic(benchmark, lambda: bookings.save(tmp_path / "bookings.csv"))
+
+
+def test_repr_html(benchmark, size):
+    bookings = _bookings(size)
+    html = _pedantic(benchmark, bookings._repr_html_)
+    assert html
+
+
+def test_html_table(benchmark, size):
+    bookings = _bookings(size)
+    html = _pedantic(
+        benchmark, lambda: bookings.html_filter_entry_without_category(False)
+    )
+    assert html.count("<tr>") == size + 1
+
+
+@pytest.mark.parametrize("aggregation", ["sum_by_payee", "sum_by_category"])
+def test_aggregation(benchmark, size, aggregation):
+    bookings = _bookings(size)
+    result = benchmark(getattr(bookings, aggregation))
+    assert result
+
+
+def test_columns_aggregation(benchmark, size):
+    pytest.importorskip("numpy")
+    columns = _bookings(size).to_columns()
+    result = benchmark(columns.sum_by_category)
+    assert result
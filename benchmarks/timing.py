@@ -0,0 +1,18 @@
+"""
+Timing helpers shared by the ``bench_*.py`` scripts.
+"""
+
+import timeit
+from typing import Callable
+
+
+def best_of(func: Callable[[], object], repeat: int = 3) -> float:
+    """Best wall clock time in seconds of ``repeat`` single calls of ``func``"""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(label: str, func: Callable[[], object], repeat: int = 3) -> float:
+    """Print the best time of ``func`` in milliseconds after ``label``"""
+    best = best_of(func, repeat)
+    print(f"{label}: {best * 1000:10.2f} ms")
+    return best
@@ -16,8 +16,19 @@ finally:
     del version, PackageNotFoundError
 
 from .booking import Booking
-from .bookings import Bookings
-from .statement_reader import csv2bookings, files2booking, pdf2bookings, txt2bookings
+from .bookings import Bookings, write_bookings_csv
+from .cache import StatementCache
+from .columns import BookingColumns
+from .profiling import Profile, profiling
+from .records import BookingRecords
+from .statement_reader import (
+    csv2bookings,
+    files2booking,
+    iter_booking_batches,
+    iter_bookings,
+    pdf2bookings,
+    txt2bookings,
+)
 
 __all__ = [
     "csv2bookings",
@@ -25,5 +36,13 @@ __all__ = [
     "pdf2bookings",
     "Booking",
     "Bookings",
+    "BookingColumns",
+    "BookingRecords",
     "files2booking",
+    "StatementCache",
+    "iter_bookings",
+    "iter_booking_batches",
+    "Profile",
+    "profiling",
+    "write_bookings_csv",
 ]
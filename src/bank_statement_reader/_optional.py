@@ -0,0 +1,13 @@
+"""Optional dependencies, imported on first use"""
+
+
+def require_numpy():
+    """Import numpy, it is only needed to work with whole columns"""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        raise ImportError(
+            "Parsing and aggregating whole columns requires numpy, install it "
+            "with `pip install bank_statement_reader[columns]`"
+        )
+    return numpy
@@ -0,0 +1,160 @@
+"""
+Read statements from asyncio applications without blocking the event loop
+
+poppler is run as asynchronous subprocess, pdfminer and the parsing of the
+extracted text run in an executor.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from .bookings import Bookings
+from .cache import StatementCache
+from .extraction import (
+    ExtractorSelector,
+    aextract_text_cached,
+    booking_pages_cached,
+    pdf_fingerprint,
+)
+from .profiling import record_extractor, stage
+from .statement_reader import (
+    _load_cached_bookings,
+    _naming_file,
+    _statement_files,
+    _store_cached_bookings,
+    _text2bookings,
+    _year_if_usable,
+    csv2bookings,
+    extractor_selector,
+)
+
+logger = getLogger("bank_statement_reader.async_reader")
+
+# Number of statements read at the same time by `afiles2booking`
+DEFAULT_CONCURRENCY = 8
+
+
+async def apdf2bookings(
+    filepath: PathLike,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+    executor: Optional[Executor] = None,
+    prescan: bool = False,
+) -> Bookings:
+    """
+    Read the bookings of a PDF statement, see `pdf2bookings`
+
+    :param executor: runs pdfminer and the parsing, the default executor of the
+                     loop if None. Use a `ProcessPoolExecutor` to parse in parallel.
+    """
+    loop = asyncio.get_event_loop()
+    if cache is not None:
+        key, bookings = await loop.run_in_executor(
+            None, _load_cached_bookings, filepath, cache
+        )
+        if bookings is not None:
+            return bookings
+    text, year = await _apdf_text_and_year(filepath, cache, selector, executor, prescan)
+    # the stages within the executor are not recorded, so time them together
+    with stage("parse", filepath) as run:
+        bookings = await loop.run_in_executor(
+            executor, _text2bookings, text, year, filepath
+        )
+        run.items = len(bookings)
+    if cache is not None:
+        await loop.run_in_executor(None, _store_cached_bookings, cache, key, bookings)
+    return bookings
+
+
+async def _apdf_text_and_year(
+    filepath: PathLike,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+    executor: Optional[Executor] = None,
+    prescan: bool = False,
+) -> Tuple[str, str]:
+    """Like `_pdf_text_and_year`, but extracting the text asynchronously"""
+    logger.debug(f"Reading {filepath}")
+    loop = asyncio.get_event_loop()
+    if selector is None:
+        selector = extractor_selector
+    with stage("fingerprint", filepath):
+        fingerprint = await loop.run_in_executor(None, pdf_fingerprint, filepath)
+    pages = None
+    if prescan:
+        with stage("prescan", filepath) as run:
+            pages = await loop.run_in_executor(
+                executor, booking_pages_cached, filepath, cache
+            )
+            run.items = 0 if pages is None else len(pages)
+    # the selector reads and writes the cache, keep the file access off the loop,
+    # but within this process, as the selector learns in memory too
+    extractors = await loop.run_in_executor(None, selector.order, fingerprint, cache)
+    for number, extractor in enumerate(extractors, 1):
+        is_last = number == len(extractors)
+        with stage(f"extract.{extractor}", filepath) as run:
+            text = await aextract_text_cached(
+                filepath, extractor, cache, executor, pages
+            )
+            run.items = len(text)
+        year = _year_if_usable(text, filepath, is_last)
+        if year is not None:
+            await loop.run_in_executor(
+                None, selector.succeeded, fingerprint, extractor, number == 1, cache
+            )
+            record_extractor(filepath, extractor, fallbacks=number - 1)
+            return text, year
+        logger.debug(f"Extracting text with {extractor} failed for {filepath}")
+        selector.failed(extractor)
+
+
+async def acsv2bookings(
+    filename: PathLike, cache: Optional[StatementCache] = None
+) -> Bookings:
+    """Read a GLS csv export, see `csv2bookings`"""
+    return await asyncio.get_event_loop().run_in_executor(
+        None, csv2bookings, filename, cache
+    )
+
+
+async def _afile2bookings(
+    filename: Path,
+    semaphore: asyncio.Semaphore,
+    cache: Optional[StatementCache] = None,
+    executor: Optional[Executor] = None,
+) -> Bookings:
+    async with semaphore:
+        with _naming_file(filename):
+            if filename.suffix.lower() == ".pdf":
+                return await apdf2bookings(filename, cache, executor=executor)
+            return await acsv2bookings(filename, cache)
+
+
+async def afiles2booking(
+    files: Iterable[Path],
+    cache: Optional[StatementCache] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    executor: Optional[Executor] = None,
+) -> Bookings:
+    """
+    Read all given statements concurrently and merge them, see `files2booking`
+
+    :param concurrency: maximal number of statements read at the same time
+    :param executor: runs pdfminer and the parsing, see `apdf2bookings`
+    """
+    statements = _statement_files(files)
+    semaphore = asyncio.Semaphore(concurrency)
+    # gather keeps the order of the files, so merging gives the same result
+    collections = await asyncio.gather(
+        *(_afile2bookings(f, semaphore, cache, executor) for f in statements)
+    )
+    with stage("merge") as run:
+        bookings = await asyncio.get_event_loop().run_in_executor(
+            None, Bookings.merge, *collections
+        )
+        run.items = len(bookings)
+    return bookings
@@ -1,16 +1,93 @@
 import datetime
+import hashlib
 import re
+from functools import lru_cache
 from logging import getLogger
+from sys import intern
 from textwrap import shorten
-from typing import Optional, Union
+from types import CodeType
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
 
-from natsort import humansorted
-from schwifty import IBAN
-
-from ..exceptions import ParsingError
+from ..parsing import collapse_spaces, normalise_type, parse_date
+from .rules import CONTAINS, EQUALS, CategoryRule, CompiledRules, category_rules
 
 logger = getLogger("statement_reader.booking_base")
 
+if TYPE_CHECKING:  # pragma: no cover
+    from schwifty import IBAN
+
+
+@lru_cache(maxsize=None)
+def natural_keygen() -> Callable[[str], Tuple]:
+    """
+    Same ordering as `natsort.humansorted`, but usable as key function
+
+    natsort is only imported when bookings are sorted for the first time.
+    """
+    from natsort import natsort_keygen, ns
+
+    return natsort_keygen(alg=ns.LOCALE)
+
+
+def natural_key(value: str) -> Tuple:
+    return natural_keygen()(value)
+
+
+RE_COMMENT_SEPARATORS = re.compile("[\n _-]+")
+
+BANK_CHARGES = "Financial expenses > Bank charges"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return value if value is None else intern(value)
+
+
+@lru_cache(maxsize=None)
+def _source_fingerprint(cls: type) -> str:
+    """
+    Hash of the modules defining cls and its booking base classes
+
+    Classes without a source file, like those defined in notebooks, use their
+    source as far as available and the byte code of their methods otherwise.
+    """
+    import inspect
+
+    sha = hashlib.sha256()
+    for klass in cls.__mro__:
+        if not issubclass(klass, BookingBase):
+            continue
+        try:
+            with open(inspect.getsourcefile(klass), "rb") as fp:
+                sha.update(fp.read())
+            continue
+        except (OSError, TypeError):
+            pass
+        try:
+            sha.update(inspect.getsource(klass).encode("UTF-8"))
+        except (OSError, TypeError):
+            for name, value in sorted(vars(klass).items()):
+                for func in (value, getattr(value, "__func__", None)) + (
+                    (value.fget, value.fset) if isinstance(value, property) else ()
+                ):
+                    code = getattr(func, "__code__", None)
+                    if code is not None:
+                        sha.update(name.encode("UTF-8"))
+                        _update_with_code(sha, code)
+    return sha.hexdigest()
+
+
+def _update_with_code(sha, code: CodeType):
+    """Add byte code, names and constants of code, independent of its address"""
+    sha.update(code.co_code)
+    sha.update(repr(code.co_names).encode("UTF-8"))
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _update_with_code(sha, const)
+        elif isinstance(const, frozenset):
+            sha.update(repr(sorted(map(repr, const))).encode("UTF-8"))
+        else:
+            sha.update(repr(const).encode("UTF-8"))
+
 
 class BookingBase:
     type_convert = {
@@ -49,13 +126,210 @@ class BookingBase:
         "GLS BankCard Gebühr": "Kontogebühren",
     }
 
+    # Payees starting with one of these (ignoring case) are set to it (stripped)
+    payee_prefixes: List[str] = [
+        "TAZ",
+        "POCO",
+        "REWE",
+        "Denns",
+        "DEBEKA",
+        "Allianz",
+        "IKK",
+        "OBI ",
+        "DB ",
+        "Rossmann",
+        "Thalia",
+        "Combi ",
+        "AKTIV UND IRMA",
+        "KFW",
+    ]
+
+    # Payees containing a key (ignoring case) are set to its value
+    payee_contains: Dict[str, str] = {
+        "SATURN": "Saturn",
+        "FRISCHEMARKT": "EDEKA",
+        "EDEKA": "EDEKA",
+        "LIDL": "LIDL",
+    }
+
+    # PayPal bookings with a comment containing a key (ignoring case) get its value
+    paypal_payees: Dict[str, str] = {
+        "spotify": "Spotify",
+        "MUDJEANS": "Mudjeans",
+        "TAZ": "TAZ",
+    }
+
+    # The category of a booking is the one of the first matching rule
+    category_rules: List[CategoryRule] = [
+        CategoryRule("type", EQUALS, "Bargeldabhebung", "Cash Withdrawal"),
+        CategoryRule("type", EQUALS, "Kontogebühren", BANK_CHARGES),
+        CategoryRule(
+            "comment", CONTAINS, "GLS Beitrag", BANK_CHARGES, set_type="Kontogebühren"
+        ),
+        CategoryRule("type", EQUALS, "Gehalt", "Einnahmen > Gehalt"),
+        *category_rules("payee", EQUALS, ["IKK", "Allianz", "DEBEKA"], "Insurance"),
+        *category_rules(
+            "payee",
+            EQUALS,
+            [
+                "Combi",
+                "EDEKA",
+                "AKTIV UND IRMA",
+                "REWE",
+                "Denns",
+                "Superbiomarkt",
+                "LIDL",
+            ],
+            "Nahrung > Grocery",
+        ),
+        *category_rules(
+            "payee",
+            EQUALS,
+            ["PayPal", "AMAZON", "Pollin", "Saturn", "Reichelt"],
+            "Anschaffungen > Sonstiges",
+        ),
+        CategoryRule("payee", EQUALS, "KFW", "Loan"),
+        CategoryRule("payee", EQUALS, "DB", "Transport > Train"),
+        CategoryRule("payee", EQUALS, "Spotify", "Leisures > Music"),
+        CategoryRule("payee", EQUALS, "Mudjeans", "Care > Clothing"),
+        *category_rules("payee", EQUALS, ["DM", "Rossmann"], "Care > Careproducts"),
+        CategoryRule(
+            "payee", CONTAINS, "APOTHEKE", "Health > Chemist", ignore_case=True
+        ),
+        *category_rules(
+            "payee", EQUALS, ["TAZ", "Stiftung Warentest"], "Education > Newspaper"
+        ),
+        CategoryRule("payee", EQUALS, "Thalia", "Education > Books"),
+        CategoryRule("comment", CONTAINS, "miete", "Miete", ignore_case=True),
+    ]
+
+    # Bookings of long histories are many, so avoid an instance dict for each.
+    # Subclasses without `__slots__` (e.g. in `personal.py`) still get one.
+    __slots__ = (
+        "_type",
+        "_date",
+        "amount",
+        "_iban",
+        "_wrong_type",
+        "_comment",
+        "_payee",
+        "_sort_key",
+        "_normalised_comment",
+        "_category",
+    )
+
+    # Increase if the rules for types, payees or categories are changed, so
+    # bookings cached with the old rules are read again.
+    # Subclasses in `personal.py` should do the same.
+    rules_version: str = "1"
+
     def __init__(self):
         self._type = None
         self._date: Optional[datetime.date] = None
         self.amount: Optional[float] = None
-        self._iban: Optional[IBAN] = None
+        self._iban: Optional["IBAN"] = None
         self._wrong_type = None
         self._comment: str = ""
+        self._payee: str = ""
+        self._sort_key: Optional[Tuple] = None
+        self._normalised_comment: Optional[str] = None
+        self._category: Optional[str] = None
+
+    @classmethod
+    def from_record(
+        cls,
+        date: datetime.date,
+        type: str,
+        amount: float,
+        payee: str,
+        comment: str,
+        category: Optional[str] = None,
+    ) -> "BookingBase":
+        """
+        Create a booking from values that were already normalised by a booking
+
+        No type conversion or payee rules are applied. If the category is given,
+        it is used until type, payee or comment change.
+        """
+        booking = cls()
+        booking._date = date
+        booking._type = _intern(type)
+        booking.amount = amount
+        booking._payee = _intern(payee)
+        booking._comment = comment
+        booking._category = category
+        return booking
+
+    @classmethod
+    def compiled_rules(cls) -> CompiledRules:
+        """
+        Payee and category rules of this class, compiled once on first use
+
+        Subclasses changing `payee_prefixes`, `payee_contains`, `paypal_payees`
+        or `category_rules` get their own compiled rules.
+        """
+        compiled = cls.__dict__.get("_compiled_rules")
+        if compiled is None:
+            compiled = CompiledRules(
+                cls.payee_prefixes,
+                cls.payee_contains,
+                cls.paypal_payees,
+                cls.category_rules,
+            )
+            cls._compiled_rules = compiled
+        return compiled
+
+    @classmethod
+    def rules_fingerprint(cls) -> str:
+        """
+        Identify the rules bookings of this class are created with
+
+        Besides the rule tables the source of the booking classes is included,
+        so overriding e.g. `_set_payee` or `_get_category` changes it as well.
+        """
+        rules = (
+            cls.__module__,
+            cls.__qualname__,
+            _source_fingerprint(cls),
+            cls.rules_version,
+            sorted(cls.type_convert.items()),
+            cls.payee_prefixes,
+            list(cls.payee_contains.items()),
+            list(cls.paypal_payees.items()),
+            cls.category_rules,
+        )
+        return hashlib.sha256(repr(rules).encode("UTF-8")).hexdigest()[:16]
+
+    def _invalidate(self):
+        """Drop values derived from type, payee or comment"""
+        self._sort_key = None
+        self._normalised_comment = None
+        self._category = None
+
+    @property
+    def sort_key(self) -> Tuple:
+        """
+        Key bookings are ordered by: date, then payee and comment in natural order
+
+        It is computed once and cached until one of those fields changes.
+        """
+        if self._sort_key is None:
+            key = natural_keygen()
+            self._sort_key = (self.date, key(self.payee), key(self.comment))
+        return self._sort_key
+
+    @property
+    def normalised_comment(self) -> str:
+        """
+        Comment in lower case with all separators replaced by '_'
+
+        Used to compare comments when looking for duplicates.
+        """
+        if self._normalised_comment is None:
+            self._normalised_comment = RE_COMMENT_SEPARATORS.sub(
+                "_", self.comment
+            ).lower()
+        return self._normalised_comment
 
     @property
     def date(self) -> datetime.date:
@@ -64,26 +338,25 @@ class BookingBase:
     @date.setter
     def date(self, value: Union[str, datetime.date]):
         if isinstance(value, str):
-            try:
-                self._date = datetime.datetime.strptime(value, "%d.%m.%Y").date()
-            except ValueError as e:
-                raise ParsingError(
-                    f"Could not parse date from string '{value}', "
-                    f"it seems to be invalid: {e}"
-                )
+            self._date = parse_date(value)
         elif isinstance(value, datetime.date):
             self._date = value
         elif isinstance(value, datetime.datetime):
             self._date = value.date()
         else:
             raise ValueError(f"Invalid date type {type(value)} given for date")
+        # only the sort key depends on the date
+        self._sort_key = None
 
     @property
-    def iban(self) -> IBAN:
+    def iban(self) -> "IBAN":
         return self._iban
 
     @iban.setter
     def iban(self, value: Optional[str]):
+        # schwifty loads the bank registries on import, so only do it when needed
+        from schwifty import IBAN
+
         try:
             if self._iban is not None:
                 self._iban = IBAN(value)
@@ -99,7 +372,8 @@ class BookingBase:
     @comment.setter
     def comment(self, value: str):
         # ignore duplicate spaces
-        self._comment = re.sub("[ ]+", " ", value)
+        self._comment = collapse_spaces(value)
+        self._invalidate()
 
     @property
     def type(self) -> str:
@@ -110,12 +384,7 @@ class BookingBase:
         """
         Set the type of transaction - can be done only once and has to be a valid type!
         """
-        value = re.sub("Wertstellung: [0-9]{2}.[0-9]{2}.", "", value).strip()
-        # New bank records included strage PN values, so we need to extract them
-        value = re.sub("PN:[ ]*[0-9]{1,10}", " ", value)
-        # Also the refer to the appendix, we don't like that
-        value = re.sub("(lt.[ ]*)?[ ]*Anlage[ ]*[0-9]+", " ", value)
-        value = value.strip()
+        value = normalise_type(value)
         type_convert = self.__class__.type_convert
         if value in type_convert and self._type is None:
             self._type = type_convert.get(value)
@@ -127,7 +396,9 @@ class BookingBase:
                 print(
                     f"Reset type from '{self._type}' ({self._wrong_type}) to '{value}'"
                 )
-                self._type = value
+                self._type = intern(value)
+        # the payee of bank charges depends on the type
+        self._invalidate()
 
     @property
     def payee(self) -> str:
@@ -137,31 +408,7 @@ class BookingBase:
             return self._payee
 
     def _set_payee(self, value: str):
-        beginnings = [
-            "TAZ",
-            "POCO",
-            "REWE",
-            "Denns",
-            "DEBEKA",
-            "Allianz",
-            "IKK",
-            "OBI ",
-            "DB ",
-            "Rossmann",
-            "Thalia",
-            "Combi ",
-            "AKTIV UND IRMA",
-            "KFW",
-        ]
-
-        contains = {
-            "SATURN": "Saturn",
-            "FRISCHEMARKT": "EDEKA",
-            "EDEKA": "EDEKA",
-            "LIDL": "LIDL",
-        }
-
-        paypals = {"spotify": "Spotify", "MUDJEANS": "Mudjeans", "TAZ": "TAZ"}
+        rules = self.compiled_rules()
 
         if self._wrong_type is not None:
             print("Assuming the invalid booking type is payee")
@@ -169,93 +416,63 @@ class BookingBase:
             value = self._wrong_type
             self._type = "Überweisung"
 
-        for beginn in beginnings:
-            if value.lower().strip().startswith(beginn.lower()):
-                self._payee = beginn.strip()
-                return
-
-        for key, val in contains.items():
-            if key.lower() in value.lower():
-                self._payee = val
-                return
-
-        if value.startswith("PayPal"):
+        payee = rules.payee(value)
+        if payee is not None:
+            self._payee = payee
+        elif value.startswith("PayPal"):
             # Set Booking Type correctly
             self._type = "PayPal"
-            self._payee = None
-            for key, val in paypals.items():
-                if key.lower() in self.comment.lower():
-                    self._payee = val
-                    break
-            if self._payee is None:
-                self._payee = "PayPal"
+            self._payee = rules.paypal_payee(self.comment) or "PayPal"
         elif value.upper().startswith("DM FIL"):
             self._payee = "DM"
         elif "ingenico" in value.lower() and "ross" in self.comment.lower():
             self._payee = "Rossmann"
         else:
-            self._payee = value
+            # payees repeat a lot, share one string for all their bookings
+            self._payee = intern(value)
 
     @payee.setter
     def payee(self, value: str):
         self._set_payee(value)
+        self._invalidate()
+
+    def settle(self):
+        """
+        Apply the category rules that may change the booking
+
+        A rule with `set_type` changes the type and with it the payee of bank
+        charges without payee, overridden `_get_category` may change anything.
+        `Bookings` settles bookings before storing their sort and duplicate keys.
+        """
+        if self._category is not None:
+            return
+        if type(self)._get_category is not BookingBase._get_category or (
+            self.compiled_rules().sets_type and not self._payee.strip()
+        ):
+            self._category = self._get_category()
 
     def _get_category(self) -> str:
-        insurances = ["IKK", "Allianz", "DEBEKA"]
-        newspaper = [
-            "TAZ",
-            "Stiftung Warentest",
-        ]
-        grocery = [
-            "Combi",
-            "EDEKA",
-            "AKTIV UND IRMA",
-            "Combi",
-            "REWE",
-            "Denns",
-            "Superbiomarkt",
-            "LIDL",
-        ]
-        anschaffung_sonstig = ["PayPal", "AMAZON", "Pollin", "Saturn", "Reichelt"]
-        if self.type == "Bargeldabhebung":
-            return "Cash Withdrawal"
-        elif self.type == "Kontogebühren":
-            return "Financial expenses > Bank charges"
-        elif "GLS Beitrag" in self.comment:
-            self.type = "Kontogebühren"
-            return "Financial expenses > Bank charges"
-        elif self.type == "Gehalt":
-            return "Einnahmen > Gehalt"
-        elif self.payee in insurances:
-            return "Insurance"
-        elif self.payee in grocery:
-            return "Nahrung > Grocery"
-        elif self.payee in anschaffung_sonstig:
-            return "Anschaffungen > Sonstiges"
-        elif self.payee == "KFW":
-            return "Loan"
-        elif self.payee == "DB":
-            return "Transport > Train"
-        elif self.payee == "Spotify":
-            return "Leisures > Music"
-        elif self.payee == "Mudjeans":
-            return "Care > Clothing"
-        elif self.payee == "DM" or self.payee == "Rossmann":
-            return "Care > Careproducts"
-        elif "APOTHEKE" in self.payee.upper():
-            return "Health > Chemist"
-        elif self.payee in newspaper:
-            return "Education > Newspaper"
-        elif self.payee == "Thalia":
-            return "Education > Books"
-        elif "miete" in self.comment.lower():
-            return "Miete"
-        else:
+        rule = self.compiled_rules().category_rule(
+            type=self.type, payee=self.payee, comment=self.comment
+        )
+        if rule is None:
             return "Unknown"
+        if rule.set_type is not None:
+            self.type = rule.set_type
+        return rule.category
 
     @property
     def category(self) -> str:
-        return self._get_category()
+        """
+        Category of the first matching rule
+
+        It is computed once and cached until type, payee or comment change.
+        """
+        if self._category is None:
+            # computed before storing, as _get_category may change the type
+            category = self._get_category()
+            self._category = category
+        return self._category
 
     def __str__(self):
         comment = self.comment.replace("\n", " ")
@@ -281,14 +498,7 @@ class BookingBase:
     def __lt__(self, other: "BookingBase"):
         if not isinstance(other, BookingBase):
             raise ValueError("Can only compare BookingBase to other BookingBase object")
-        if self.date == other.date:
-            if self.payee == other.payee:
-                # everything is equal, lets compare comment
-                return humansorted([self.comment, other.comment])[0] == self.comment
-            else:
-                return humansorted([self.payee, other.payee])[0] == self.comment
-        else:
-            return self.date < other.date
+        return self.sort_key < other.sort_key
 
     @property
     def _tr_(self):
@@ -0,0 +1,218 @@
+import re
+from functools import lru_cache, partial
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+EQUALS = "equals"
+CONTAINS = "contains"
+
+
+class CategoryRule(NamedTuple):
+    """
+    Booking field `field` ("type", "payee" or "comment") has to equal or contain
+    `pattern` for the booking to get `category`.
+
+    If `set_type` is given, the type of matching bookings is changed to it.
+    """
+
+    field: str
+    match: str
+    pattern: str
+    category: str
+    ignore_case: bool = False
+    set_type: Optional[str] = None
+
+
+def category_rules(
+    field: str, match: str, patterns: Iterable[str], category: str, **kwargs
+) -> List[CategoryRule]:
+    """One rule for each pattern, all resulting in the same category"""
+    return [
+        CategoryRule(field, match, pattern, category, **kwargs) for pattern in patterns
+    ]
+
+
+class OrderedMatcher:
+    """
+    Find the first pattern (in list order) contained in a value with one regex
+    for the case sensitive and one for the case insensitive patterns
+
+    Case insensitive patterns are matched against the lowered value, like
+    comparing `pattern.lower() in value.lower()` would do.
+
+    :param patterns: the strings to search for and whether to ignore their case
+    :param prefix: only match patterns at the beginning of the value
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, bool]], prefix: bool = False):
+        self.prefix = prefix
+        self.regex = self._compile(
+            (i, pattern)
+            for i, (pattern, ignore_case) in enumerate(patterns)
+            if not ignore_case
+        )
+        self.iregex = self._compile(
+            (i, pattern.lower())
+            for i, (pattern, ignore_case) in enumerate(patterns)
+            if ignore_case
+        )
+
+    def _compile(self, patterns: Iterable[Tuple[int, str]]) -> Optional[Pattern]:
+        alternatives = "|".join(
+            f"(?P<p{i}>{re.escape(pattern)})" for i, pattern in patterns
+        )
+        if not alternatives:
+            return None
+        if not self.prefix:
+            # the lookahead makes finditer try all positions, even overlapping
+            alternatives = f"(?={alternatives})"
+        return re.compile(alternatives)
+
+    def _first(self, regex: Optional[Pattern], value: str) -> Optional[int]:
+        if regex is None:
+            return None
+        if self.prefix:
+            match = regex.match(value)
+            return None if match is None else int(match.lastgroup[1:])
+        match = regex.search(value)
+        if match is None:
+            return None
+        # at each position the regex picks the first alternative in list order,
+        # so the smallest index over all positions is the first pattern contained
+        first = int(match.lastgroup[1:])
+        for match in regex.finditer(value, match.start() + 1):
+            first = min(first, int(match.lastgroup[1:]))
+        return first
+
+    def first(self, value: Optional[str]) -> Optional[int]:
+        """Index of the first pattern matching the value"""
+        if value is None:
+            return None
+        first = self._first(self.regex, value)
+        if self.iregex is not None:
+            index = self._first(self.iregex, value.lower())
+            if index is not None and (first is None or index < first):
+                first = index
+        return first
+
+
+class CompiledRules:
+    """
+    Payee and category rules of a booking class compiled into lookup tables
+    and one `OrderedMatcher` for each field, so bookings are classified in one pass
+    """
+
+    FIELDS = ("type", "payee", "comment")
+
+    def __init__(
+        self,
+        payee_prefixes: Sequence[str],
+        payee_contains: Dict[str, str],
+        paypal_payees: Dict[str, str],
+        rules: Sequence[CategoryRule],
+    ):
+        self.payee_prefixes = list(payee_prefixes)
+        self._prefix_matcher = OrderedMatcher(
+            [(prefix, True) for prefix in self.payee_prefixes], prefix=True
+        )
+        self.payee_contains = list(payee_contains.items())
+        self._contains_matcher = OrderedMatcher(
+            [(key, True) for key, _ in self.payee_contains]
+        )
+        self.paypal_payees = list(paypal_payees.items())
+        self._paypal_matcher = OrderedMatcher(
+            [(key, True) for key, _ in self.paypal_payees]
+        )
+
+        self.rules = list(rules)
+        # rule index by value of the field, for equals rules
+        self._equals: Dict[str, Dict[str, int]] = {f: {} for f in self.FIELDS}
+        self._iequals: Dict[str, Dict[str, int]] = {f: {} for f in self.FIELDS}
+        contains: Dict[str, List[Tuple[str, bool]]] = {f: [] for f in self.FIELDS}
+        # index of the rule for every pattern of the contains matchers
+        self._contains_rules: Dict[str, List[int]] = {f: [] for f in self.FIELDS}
+        for index, rule in enumerate(self.rules):
+            if rule.field not in self.FIELDS:
+                raise ValueError(f"Invalid field '{rule.field}' in rule {rule}")
+            if rule.match == EQUALS and rule.ignore_case:
+                self._iequals[rule.field].setdefault(rule.pattern.lower(), index)
+            elif rule.match == EQUALS:
+                self._equals[rule.field].setdefault(rule.pattern, index)
+            elif rule.match == CONTAINS:
+                contains[rule.field].append((rule.pattern, rule.ignore_case))
+                self._contains_rules[rule.field].append(index)
+            else:
+                raise ValueError(f"Invalid match '{rule.match}' in rule {rule}")
+        self._contains = {
+            field: OrderedMatcher(patterns) for field, patterns in contains.items()
+        }
+        # whether finding the category can change the type of a booking
+        self.sets_type = any(rule.set_type is not None for rule in self.rules)
+        # types and payees repeat a lot, so remember their normalised payee and
+        # first matching rule
+        self._payee = lru_cache(maxsize=4096)(self._match_payee)
+        self._first_type_rule = lru_cache(maxsize=4096)(
+            partial(self._first_rule, "type")
+        )
+        self._first_payee_rule = lru_cache(maxsize=4096)(
+            partial(self._first_rule, "payee")
+        )
+
+    def payee(self, value: str) -> Optional[str]:
+        """Normalised payee if value starts with or contains a known payee"""
+        return self._payee(value)
+
+    def _match_payee(self, value: str) -> Optional[str]:
+        index = self._prefix_matcher.first(value.strip())
+        if index is not None:
+            return self.payee_prefixes[index].strip()
+        index = self._contains_matcher.first(value)
+        if index is not None:
+            return self.payee_contains[index][1]
+        return None
+
+    def paypal_payee(self, comment: str) -> Optional[str]:
+        """Payee of a PayPal booking with the given comment"""
+        index = self._paypal_matcher.first(comment)
+        if index is not None:
+            return self.paypal_payees[index][1]
+        return None
+
+    def _first_rule(self, field: str, value: Optional[str]) -> Optional[int]:
+        """Index of the first rule matching the value of field"""
+        if value is None:
+            return None
+        first = self._equals[field].get(value)
+        if self._iequals[field]:
+            index = self._iequals[field].get(value.lower())
+            if index is not None and (first is None or index < first):
+                first = index
+        index = self._contains[field].first(value)
+        if index is not None:
+            index = self._contains_rules[field][index]
+            if first is None or index < first:
+                first = index
+        return first
+
+    def category_rule(
+        self, type: Optional[str], payee: Optional[str], comment: Optional[str]
+    ) -> Optional[CategoryRule]:
+        """First rule matching the given type, payee and comment"""
+        candidates = [
+            index
+            for index in (
+                self._first_type_rule(type),
+                self._first_payee_rule(payee),
+                self._first_rule("comment", comment),
+            )
+            if index is not None
+        ]
+        return self.rules[min(candidates)] if candidates else None
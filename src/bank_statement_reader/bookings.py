@@ -1,73 +1,205 @@
+import heapq
 import logging
-import re
-from datetime import date
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import islice
+from operator import attrgetter
 from os import PathLike
 from pathlib import Path
 from textwrap import indent
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .booking import Booking
+from .columns import BookingColumns
+from .profiling import stage
+from .records import BookingRecords
 
 logger = logging.getLogger("bank_statement_reader.bookings")
 logger_dupes = logging.getLogger("bank_statement_reader.duplicates")
 
+sort_key = attrgetter("sort_key")
+
 
 class Bookings(list):
+    """
+    List of bookings that is always kept in chronological order
+
+    Bookings are inserted at their sorted position on :meth:`append`, so iterating
+    does not need to sort the whole list again.
+    """
+
     STRICT_COMPARING: bool = True
+    # Number of bookings shown by repr and in notebooks, see `page` for the others
+    DISPLAY_ROWS: int = 50
 
     def __init__(self):
         super().__init__()
         self.daterelation: Dict[date, list] = dict()
+        # Sort keys of the bookings, kept in the same order as the list itself
+        self._keys: List[Tuple] = []
+        # First booking added for (date, payee, amount) and for
+        # (date, payee, amount, normalised comment), used to find duplicates
+        self._loose_index: Dict[Tuple, Booking] = dict()
+        self._strict_index: Dict[Tuple, Booking] = dict()
 
-    def html_filter_entry_without_category(self, filter: bool = True):
-        result = (
-            "<table class='table_basic'>"
-            "<tr><th>Date</th><th>Category</th><th>Type</th>"
-            "<th>Amount</th><th>Payee</th><th>Comment</th></tr>"
-        )
-        for i in self:
-            if not i.category or not filter:
-                result = f"{result}\n<tr>{i._tr_}</tr>"
-        return f"{result}</table>"
+    def html_filter_entry_without_category(
+        self, filter: bool = True, max_rows: Optional[int] = None
+    ) -> str:
+        """
+        Html table of the bookings, only of those without category if filter
+
+        :param max_rows: only show the first max_rows bookings and how many
+                         bookings were left out
+        """
+        if filter:
+            return _html_table((b for b in self if not b.category), max_rows)
+        return _html_table(self, max_rows)
+
+    def page(self, number: int, size: Optional[int] = None) -> "BookingsPage":
+        """
+        Page number (counting from 0) of the bookings, rendered only when shown
+
+        :param size: bookings per page, defaults to `DISPLAY_ROWS`
+        """
+        size = self.DISPLAY_ROWS if size is None else size
+        if size < 1 or number < 0:
+            raise ValueError(f"Invalid page {number} of size {size}")
+        return BookingsPage(self, number * size, size)
 
     def _repr_html_(self):
-        return self.html_filter_entry_without_category(False)
+        if len(self) <= self.DISPLAY_ROWS:
+            return self.html_filter_entry_without_category(False)
+        return self.page(0)._repr_html_()
 
     def __repr__(self):
-        result = " [\n"
-        for itm in self:
-            result += "  " + repr(itm) + "\n"
-        return result + "]"
+        rows = [f"  {booking!r}\n" for booking in islice(self, self.DISPLAY_ROWS)]
+        if len(self) > self.DISPLAY_ROWS:
+            rows.append(f"  … {len(self) - self.DISPLAY_ROWS} more bookings\n")
+        return f" [\n{''.join(rows)}]"
 
-    def __iter__(self):
-        """Always sort"""
-        for itm in sorted(super().__iter__()):
-            yield itm
+    def __reduce__(self):
+        # list subclasses are unpickled by appending before the attributes are set,
+        # so rebuild the indices from the plain list instead
+        return _restore_bookings, (self.__class__, list(self))
 
     def __add__(self, other: "Bookings"):
-        result = Bookings()
-        # for key in sorted(self.daterelation.keys() + other.daterelation.keys()):
-        for itm in self:
-            result.append(itm, ignore_duplicates=True)
-        for itm in other:
-            result.append(itm, ignore_duplicates=True)
+        return self.merge(self, other)
+
+    def pop(self, index: int = -1) -> Booking:
+        booking = super().pop(index)
+        del self._keys[index]
+        self._unregister(booking)
+        return booking
+
+    def remove(self, booking: Booking):
+        del self[self.index(booking)]
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        del self._keys[index]
+        for booking in removed:
+            self._unregister(booking)
+
+    def clear(self):
+        super().clear()
+        self._keys.clear()
+        self.daterelation.clear()
+        self._loose_index.clear()
+        self._strict_index.clear()
+
+    def sort(self, *, key=None, reverse: bool = False):
+        """Bookings are always sorted, only other orders are refused"""
+        if key is not None or reverse:
+            raise TypeError("Bookings are kept in chronological order")
+
+    def _refuse_reordering(self, *args, **kwargs):
+        raise TypeError(
+            "Bookings are kept in chronological order, use append or extend "
+            "to add bookings"
+        )
+
+    insert = __setitem__ = reverse = __imul__ = _refuse_reordering
+
+    def __iadd__(self, other: "Bookings"):
+        """add the bookings of other in place"""
+        self.extend(other)
+        return self
+
+    @classmethod
+    def merge(
+        cls, *collections: Iterable[Booking], ignore_duplicates: bool = True
+    ) -> "Bookings":
+        """
+        Create new bookings from all given collections
+
+        Duplicates are detected like bookings were appended collection by
+        collection, but the sorted collections are merged in a single pass.
+        """
+        result = cls()
+        result._merge(collections, ignore_duplicates)
         return result
 
-    def __iadd__(self, other):
-        """allow same handling for += like for add"""
-        return self.__add__(other)
+    def extend(self, bookings: Iterable[Booking], ignore_duplicates: bool = True):
+        """Add many bookings at once, see :meth:`merge`"""
+        self._merge([bookings], ignore_duplicates)
 
     @property
-    def start_date(self):
-        return list(sorted(self.daterelation.keys()))[0]
+    def start_date(self) -> date:
+        return self[0].date
 
     @property
-    def end_date(self):
-        return list(sorted(self.daterelation.keys()))[-1]
+    def end_date(self) -> date:
+        return self[-1].date
+
+    def between(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> "Bookings":
+        """
+        Bookings from start_date until end_date (both included)
+
+        Only the bookings within the range are touched, they are found by bisection.
+        """
+        result = self.__class__()
+        result.extend(self._between(start_date, end_date), ignore_duplicates=False)
+        return result
+
+    def _between(
+        self, start_date: Optional[date], end_date: Optional[date]
+    ) -> List[Booking]:
+        low = 0 if start_date is None else bisect_left(self._keys, (start_date,))
+        if end_date is None or end_date >= date.max:
+            high = len(self)
+        else:
+            # sort keys start with the date, so (date,) sorts before all its keys
+            high = bisect_left(self._keys, (end_date + timedelta(days=1),))
+        return self[low:high]
 
     @property
-    def sum(self):
-        return sum([itm for itm in self])
+    def sum(self) -> float:
+        return sum(itm.amount for itm in self)
+
+    def to_columns(self) -> BookingColumns:
+        """
+        Column oriented copy of the bookings for fast aggregations (needs numpy)
+        """
+        return BookingColumns.from_bookings(self)
+
+    @classmethod
+    def from_columns(cls, columns: BookingColumns) -> "Bookings":
+        result = cls()
+        result.extend(columns.to_bookings(), ignore_duplicates=False)
+        return result
+
+    def to_records(self) -> BookingRecords:
+        """Memory lean copy of the bookings for keeping long histories"""
+        return BookingRecords(self)
+
+    @classmethod
+    def from_records(cls, records: BookingRecords) -> "Bookings":
+        result = cls()
+        result.extend(records, ignore_duplicates=False)
+        return result
 
     def test_logger(self):
         logger.info("Info")
@@ -107,47 +239,112 @@ class Bookings(list):
             filename = filename.parent / str(filename.name).replace(
                 "%date_string%", f"{start_date:%Y-%m-%d}_to_{end_date:%Y-%m-%d}"
             )
-        with open(filename, "w", newline="\n", encoding="utf-8") as fp:
-            fp.write("Date;Category;Type;Amount;Payee;Comment\n")
-            for i in self:
-                i: Booking
-                if i.date > end_date:
-                    break
-                if i.date >= start_date:
-                    fp.write(f"{i}\n")
+        write_bookings_csv(self._between(start_date, end_date), filename)
         logger.info(f"Saved bookings to '{filename.absolute()}'")
         return filename.absolute()
 
     def append(self, booking: Booking, ignore_duplicates: bool = True):
-        self.daterelation.setdefault(booking.date, [])
+        if self._accept(booking, ignore_duplicates):
+            self._insort(booking)
+
+    def _accept(self, booking: Booking, ignore_duplicates: bool) -> bool:
+        """
+        Register the booking unless it is a duplicate that should be ignored
+
+        :return: whether the booking needs to be inserted
+        """
+        booking.settle()
         if ignore_duplicates:
-            for old_booking in self.daterelation[booking.date]:
-                old_booking: Booking
-                if (
-                    old_booking.payee == booking.payee
-                    and old_booking.amount == booking.amount
-                ):
-                    if not self.STRICT_COMPARING:
-                        logger_dupes.warning(
-                            f"Ignoring:\n"
-                            f"{indent(str(booking), ' ' * 6)}\n  "
-                            f"as possible duplicate of\n"
-                            f"{indent(str(old_booking), ' ' * 6)}"
-                        )
-                        return
-                    else:
-                        old_comment = re.sub(
-                            "[\n _-]+", "_", old_booking.comment
-                        ).lower()
-                        new_comment = re.sub("[\n _-]+", "_", booking.comment).lower()
-                        if old_comment == new_comment:
-                            logger_dupes.warning(
-                                f"Ignoring:\n{indent(str(booking), ' '*6)}\n  "
-                                f"as duplicate of\n{indent(str(old_booking), ' '*6)}"
-                            )
-                            return
-        self.daterelation[booking.date].append(booking)
-        super().append(booking)
+            old_booking = self._find_duplicate(booking)
+            if old_booking is not None:
+                if not self.STRICT_COMPARING:
+                    logger_dupes.warning(
+                        f"Ignoring:\n"
+                        f"{indent(str(booking), ' ' * 6)}\n  "
+                        f"as possible duplicate of\n"
+                        f"{indent(str(old_booking), ' ' * 6)}"
+                    )
+                else:
+                    logger_dupes.warning(
+                        f"Ignoring:\n{indent(str(booking), ' '*6)}\n  "
+                        f"as duplicate of\n{indent(str(old_booking), ' '*6)}"
+                    )
+                return False
+        self._register(booking)
+        return True
+
+    def _find_duplicate(self, booking: Booking) -> Optional[Booking]:
+        """
+        Return the first booking added that `booking` is a duplicate of
+
+        Bookings are duplicates if date, payee and amount are equal and, if
+        `STRICT_COMPARING` is set, also the normalised comment.
+        """
+        key = (booking.date, booking.payee, booking.amount)
+        if self.STRICT_COMPARING:
+            return self._strict_index.get(key + (booking.normalised_comment,))
+        return self._loose_index.get(key)
+
+    def _register(self, booking: Booking):
+        """Add booking to the date relation and the duplicate indices"""
+        self.daterelation.setdefault(booking.date, []).append(booking)
+        self._index(booking)
+
+    def _index(self, booking: Booking):
+        key = (booking.date, booking.payee, booking.amount)
+        self._loose_index.setdefault(key, booking)
+        self._strict_index.setdefault(key + (booking.normalised_comment,), booking)
+
+    def _unregister(self, booking: Booking):
+        """Remove a booking from the date relation and the duplicate indices"""
+        same_day = self.daterelation.get(booking.date, [])
+        for position, other in enumerate(same_day):
+            if other is booking:
+                del same_day[position]
+                break
+        if not same_day:
+            self.daterelation.pop(booking.date, None)
+        key = (booking.date, booking.payee, booking.amount)
+        for index, index_key in (
+            (self._loose_index, key),
+            (self._strict_index, key + (booking.normalised_comment,)),
+        ):
+            if index.get(index_key) is booking:
+                del index[index_key]
+        # let the next booking added with the same keys take over, if there is one
+        for other in same_day:
+            self._index(other)
+
+    def _insort(self, booking: Booking):
+        """Insert booking after all bookings that do not sort behind it"""
+        key = booking.sort_key
+        # Statements are read chronologically, so most bookings belong at the end
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            super().append(booking)
+        else:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            super().insert(position, booking)
+
+    def _merge(self, collections: Iterable[Iterable[Booking]], ignore_duplicates: bool):
+        """Filter duplicates collection by collection and merge the sorted results"""
+        runs = [list(self)]
+        unsorted = []
+        with stage("dedupe") as dedupe:
+            for collection in collections:
+                run = [b for b in collection if self._accept(b, ignore_duplicates)]
+                if not isinstance(collection, Bookings):
+                    unsorted.append(run)
+                dedupe.items += len(run)
+                runs.append(run)
+        with stage("sort") as ordering:
+            for run in unsorted:
+                run.sort(key=sort_key)
+            merged = list(heapq.merge(*runs, key=sort_key))
+            ordering.items = len(merged)
+        super().__setitem__(slice(None), merged)
+        self._keys = [booking.sort_key for booking in merged]
 
     def _sum_by_attrib(self, attrib: str) -> Dict[str, float]:
         result = {}
@@ -169,3 +366,88 @@ class Bookings(list):
 
     def sum_by_category(self) -> Dict[str, float]:
         return self._sum_by_attrib("category")
+
+
+def _restore_bookings(cls, bookings: List[Booking]) -> Bookings:
+    """Recreate pickled bookings, keeping duplicates that were added on purpose"""
+    result = cls()
+    result.extend(bookings, ignore_duplicates=False)
+    return result
+
+
+class BookingsPage:
+    """
+    The size bookings of a collection from start on, shown in notebooks
+
+    Only the bookings of the page are rendered and only when the page is shown,
+    so pages of collections of any size are displayed instantly.
+    """
+
+    def __init__(self, bookings: Bookings, start: int, size: int):
+        self.bookings = bookings
+        self.start = start
+        self.size = size
+
+    @property
+    def stop(self) -> int:
+        return min(self.start + self.size, len(self.bookings))
+
+    def __len__(self) -> int:
+        return max(self.stop - self.start, 0)
+
+    def summary(self) -> str:
+        total = len(self.bookings)
+        if not len(self):
+            return f"No bookings on this page, there are {total} bookings"
+        pages = -(-total // self.size)
+        return (
+            f"Bookings {self.start + 1} to {self.stop} of {total} "
+            f"(page {self.start // self.size + 1} of {pages}), "
+            f"from {self.bookings.start_date} to {self.bookings.end_date}"
+        )
+
+    def _repr_html_(self):
+        table = _html_table(self.bookings[self.start : self.stop])
+        return f"{table}\n<p>{self.summary()}</p>"
+
+    def __repr__(self):
+        rows = "".join(f"  {b!r}\n" for b in self.bookings[self.start : self.stop])
+        return f" [\n{rows}] {self.summary()}"
+
+
+HTML_TABLE_HEADER = (
+    "<table class='table_basic'>"
+    "<tr><th>Date</th><th>Category</th><th>Type</th>"
+    "<th>Amount</th><th>Payee</th><th>Comment</th></tr>"
+)
+
+
+def _html_table(bookings: Iterable[Booking], max_rows: Optional[int] = None) -> str:
+    """Html table of the bookings, of the first max_rows and a count of the rest"""
+    bookings = iter(bookings)
+    rows = [f"\n<tr>{booking._tr_}</tr>" for booking in islice(bookings, max_rows)]
+    more = sum(1 for _ in bookings)
+    if more:
+        rows.append(f"\n<tr><td colspan='6'>… {more} more bookings</td></tr>")
+    return f"{HTML_TABLE_HEADER}{''.join(rows)}</table>"
+
+
+def write_bookings_csv(bookings: Iterable[Booking], filename: PathLike) -> int:
+    """
+    Write the bookings to filename in the format of `Bookings.save`
+
+    Every booking is written as soon as it is available, so bookings can be
+    streamed from `iter_bookings` into a file without keeping them in memory.
+
+    :return: the number of bookings written
+    """
+    count = 0
+    with stage("write_csv", filename) as run, open(
+        filename, "w", newline="\n", encoding="utf-8"
+    ) as fp:
+        fp.write("Date;Category;Type;Amount;Payee;Comment\n")
+        for booking in bookings:
+            fp.write(f"{booking}\n")
+            count += 1
+        run.items = count
+    return count
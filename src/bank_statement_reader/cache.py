@@ -0,0 +1,150 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = getLogger("bank_statement_reader.cache")
+
+DEFAULT_MAX_SIZE = 256 * 1024**2
+
+
+def default_cache_dir() -> Path:
+    """Directory used for caching if none is given: `$XDG_CACHE_HOME/...`"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "bank_statement_reader"
+
+
+class StatementCache:
+    """
+    Content addressed cache on disk for data extracted from statement files
+
+    Entries are addressed by the hash of the file content, so renamed or moved
+    statements are still found. When the cache grows over `max_size` bytes, the
+    least recently used entries are removed.
+
+    As the entries contain statement data, the directory and the entries are
+    only readable by the user.
+
+    The directory is scanned once on the first put, after that the sizes of the
+    entries are tracked in memory in least recently used order. The bookkeeping
+    is locked, so one cache can be used by several threads.
+    """
+
+    def __init__(self, directory: PathLike, max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        # size of each entry by key, least recently used first, None until scanned
+        self._sizes: Optional["OrderedDict[str, int]"] = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def digest(self, filepath: PathLike) -> str:
+        """SHA-256 of the file content, remembered as long as the file is unchanged"""
+        stat = os.stat(filepath)
+        file_id = (str(Path(filepath).absolute()), stat.st_size, stat.st_mtime_ns)
+        if file_id not in self._digests:
+            sha = hashlib.sha256()
+            with open(filepath, "rb") as fp:
+                for chunk in iter(lambda: fp.read(1024**2), b""):
+                    sha.update(chunk)
+            self._digests[file_id] = sha.hexdigest()
+        return self._digests[file_id]
+
+    def key(self, filepath: PathLike, *parts: str) -> str:
+        """Key for data derived from the content of filepath in the way of parts"""
+        return "-".join((self.digest(filepath),) + parts)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.directory / key
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            # the modification time is used to find the least recently used entries
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if self._sizes is not None and key in self._sizes:
+                self._sizes.move_to_end(key)
+        logger.debug(f"Cache hit for '{key}'")
+        return data
+
+    def put(self, key: str, data: bytes):
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path = self.directory / key
+        # write to a temporary file first, so parallel readers never see half entries
+        tmp_path = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "wb") as fp:
+            fp.write(data)
+        with self._lock:
+            os.replace(tmp_path, path)
+            if self._sizes is None:
+                self._scan()
+            else:
+                self._total += len(data) - self._sizes.pop(key, 0)
+                self._sizes[key] = len(data)
+            if self._total > self.max_size:
+                self._evict()
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    entry.unlink()
+                except FileNotFoundError:
+                    pass
+            self._sizes = None
+        logger.info(f"Cleared cache '{self.directory}'")
+
+    def _entries(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [
+            entry
+            for entry in self.directory.iterdir()
+            if not entry.name.startswith(".") and entry.is_file()
+        ]
+
+    def _scan(self):
+        """
+        Read the sizes of all entries, ordered by their modification time
+
+        Called with the lock held, like `_evict`.
+        """
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                pass
+        entries.sort(key=lambda item: item[0].st_mtime_ns)
+        self._sizes = OrderedDict((entry.name, stat.st_size) for stat, entry in entries)
+        self._total = sum(self._sizes.values())
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits into max_size"""
+        while self._total > self.max_size and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            try:
+                (self.directory / key).unlink()
+            except FileNotFoundError:
+                pass
+            self._total -= size
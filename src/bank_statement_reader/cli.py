@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import List, Optional
 
 from . import Bookings, files2booking
+from .cache import StatementCache, default_cache_dir
+from .profiling import profiling
 
 
 def main(args: List[str]):
@@ -37,7 +39,45 @@ def main(args: List[str]):
         default=None,
     )
 
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        metavar="N",
+        dest="jobs",
+        type=int,
+        help="number of files to read in parallel (default: 1)",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        dest="cache_dir",
+        type=Path,
+        help=f"cache extracted text and bookings in DIR, i.e. {default_cache_dir()} "
+        f"(default: no cache)",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--clear-cache",
+        dest="clear_cache",
+        action="store_true",
+        help="remove all data cached in --cache-dir before converting",
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="out.json",
+        dest="profile_file",
+        type=Path,
+        help="write the time spent in each stage of reading to a json file",
+        default=None,
+    )
+
     args = parser.parse_args(args)
+    if args.clear_cache and args.cache_dir is None:
+        parser.error("--clear-cache requires --cache-dir")
 
     files = [Path(file_obj.name).absolute() for file_obj in args.input_files]
 
@@ -46,10 +86,20 @@ def main(args: List[str]):
     if args.output_file is not None:
         outfile_name = Path(args.output_file.name).absolute()
 
-    bookings: Bookings = files2booking(files)
-    outfile_name = bookings.save(outfile_name)
+    cache = None
+    if args.cache_dir is not None:
+        cache = StatementCache(args.cache_dir)
+        if args.clear_cache:
+            cache.clear()
+
+    with profiling() as profile:
+        bookings: Bookings = files2booking(files, workers=args.jobs, cache=cache)
+        outfile_name = bookings.save(outfile_name)
 
     print(f"Successfully wrote {outfile_name}")
+    if args.profile_file is not None:
+        profile.write_json(args.profile_file)
+        print(f"Wrote profile to {args.profile_file}")
 
 
 def run(args: Optional[List[str]] = None):
@@ -0,0 +1,140 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from ._optional import require_numpy
+from .booking import Booking
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+    from .bookings import Bookings
+
+CATEGORICAL_COLUMNS = ("type", "payee", "category")
+DATE_PERIODS = {
+    "day": "datetime64[D]",
+    "month": "datetime64[M]",
+    "year": "datetime64[Y]",
+}
+
+
+def _factorize(values: List[str]) -> Tuple["np.ndarray", List[str]]:
+    """Integer codes for the values and the labels the codes refer to"""
+    np = require_numpy()
+    index: Dict[str, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(index)
+
+
+class BookingColumns:
+    """
+    Column oriented representation of bookings for fast aggregations
+
+    Amounts are stored as int64 cents, dates as datetime64[D] and type, payee
+    and category as integer codes into the lists `type_labels`, `payee_labels`
+    and `category_labels`. Requires numpy.
+    """
+
+    def __init__(
+        self,
+        dates: "np.ndarray",
+        amounts: "np.ndarray",
+        columns: Dict[str, Tuple["np.ndarray", List[str]]],
+        comments: List[str],
+    ):
+        require_numpy()
+        self.dates = dates
+        self.amounts = amounts
+        self.types, self.type_labels = columns["type"]
+        self.payees, self.payee_labels = columns["payee"]
+        self.categories, self.category_labels = columns["category"]
+        self.comments = comments
+
+    @classmethod
+    def from_bookings(cls, bookings: Iterable[Booking]) -> "BookingColumns":
+        np = require_numpy()
+        dates, amounts, types, payees, categories, comments = [], [], [], [], [], []
+        for booking in bookings:
+            dates.append(booking.date)
+            amounts.append(booking.amount)
+            types.append(booking.type)
+            payees.append(booking.payee)
+            categories.append(booking.category)
+            comments.append(booking.comment)
+        return cls(
+            dates=np.array(dates, dtype="datetime64[D]"),
+            amounts=np.rint(np.array(amounts, dtype=np.float64) * 100).astype(np.int64),
+            columns={
+                "type": _factorize(types),
+                "payee": _factorize(payees),
+                "category": _factorize(categories),
+            },
+            comments=comments,
+        )
+
+    def to_bookings(self) -> "Bookings":
+        from .bookings import Bookings
+
+        bookings = Bookings()
+        bookings.extend(
+            (
+                Booking.from_record(
+                    date=day,
+                    type=self.type_labels[type_code],
+                    amount=cents / 100,
+                    payee=self.payee_labels[payee_code],
+                    comment=comment,
+                )
+                for day, cents, type_code, payee_code, comment in zip(
+                    self.dates.tolist(),
+                    self.amounts.tolist(),
+                    self.types.tolist(),
+                    self.payees.tolist(),
+                    self.comments,
+                )
+            ),
+            ignore_duplicates=False,
+        )
+        return bookings
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def sum(self) -> float:
+        return int(self.amounts.sum()) / 100
+
+    def sum_by(self, column: str) -> Dict[str, float]:
+        """
+        Sum the amounts grouped by the given column
+
+        :param column: one of 'type', 'payee', 'category' or the date periods
+                       'day', 'month' and 'year'
+        """
+        np = require_numpy()
+        if column in CATEGORICAL_COLUMNS:
+            codes, labels = {
+                "type": (self.types, self.type_labels),
+                "payee": (self.payees, self.payee_labels),
+                "category": (self.categories, self.category_labels),
+            }[column]
+        elif column in DATE_PERIODS:
+            periods, codes = np.unique(
+                self.dates.astype(DATE_PERIODS[column]), return_inverse=True
+            )
+            labels = [str(period) for period in periods]
+        else:
+            raise ValueError(
+                f"Can only sum by {CATEGORICAL_COLUMNS + tuple(DATE_PERIODS)}, "
+                f"not by '{column}'"
+            )
+        # float64 sums of cents are exact for all realistic amounts
+        sums = np.bincount(codes, weights=self.amounts, minlength=len(labels))
+        return {label: round(cents) / 100 for label, cents in zip(labels, sums)}
+
+    def sum_by_payee(self) -> Dict[str, float]:
+        return self.sum_by("payee")
+
+    def sum_by_category(self) -> Dict[str, float]:
+        return self.sum_by("category")
@@ -0,0 +1,474 @@
+import hashlib
+import json
+import re
+import subprocess
+import threading
+import warnings
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from logging import getLogger
+from os import PathLike
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import __version__
+from .cache import StatementCache
+
+logger = getLogger("bank_statement_reader.extraction")
+
+# The pdftotext executable of poppler
+PDFTOTEXT = "pdftotext"
+
+
+# pdfminer is imported only when a PDF is read, so csv only runs start fast
+
+
+def _extract_with_pdfminer(
+    filepath: PathLike, page_numbers: Optional[Iterable[int]] = None
+) -> str:
+    from pdfminer.high_level import extract_text
+    from pdfminer.pdfdocument import PDFTextExtractionNotAllowedWarning
+
+    with warnings.catch_warnings():
+        # Ignore warning that text extraction is not allowed by the PDF
+        warnings.filterwarnings("ignore", category=PDFTextExtractionNotAllowedWarning)
+        return extract_text(filepath, page_numbers=page_numbers)
+
+
+def _extract_with_poppler(
+    filepath: PathLike, first: Optional[int] = None, last: Optional[int] = None
+) -> str:
+    pages = [] if first is None else ["-f", str(first + 1), "-l", str(last)]
+    result = subprocess.run(
+        [PDFTOTEXT, "-layout", *pages, filepath, "-"],
+        stderr=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+    )
+    return result.stdout.decode("UTF-8")
+
+
+def _extract_pages_with_poppler(filepath: PathLike, pages: Sequence[int]) -> str:
+    # pdftotext only supports page ranges
+    return "".join(
+        _extract_with_poppler(filepath, first, last) for first, last in _runs(pages)
+    )
+
+
+def _runs(pages: Sequence[int]) -> List[Tuple[int, int]]:
+    """Consecutive runs of the sorted pages as (first, last exclusive)"""
+    runs: List[Tuple[int, int]] = []
+    for page in pages:
+        if runs and runs[-1][1] == page:
+            runs[-1] = (runs[-1][0], page + 1)
+        else:
+            runs.append((page, page + 1))
+    return runs
+
+
+async def _aextract_with_poppler(
+    filepath: PathLike, first: Optional[int] = None, last: Optional[int] = None
+) -> str:
+    import asyncio
+
+    pages = [] if first is None else ["-f", str(first + 1), "-l", str(last)]
+    process = await asyncio.create_subprocess_exec(
+        PDFTOTEXT,
+        "-layout",
+        *pages,
+        str(filepath),
+        "-",
+        stderr=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    return stdout.decode("UTF-8")
+
+
+EXTRACTORS = {
+    "pdfminer": _extract_with_pdfminer,
+    "poppler": _extract_with_poppler,
+}
+
+# Extract only the given (zero based, sorted) pages
+PAGE_EXTRACTORS: Dict[str, Callable[[PathLike, Sequence[int]], str]] = {
+    "pdfminer": _extract_with_pdfminer,
+    "poppler": _extract_pages_with_poppler,
+}
+
+# Less pages are not worth starting another process for
+MIN_PAGES_PER_WORKER = 4
+
+# The pre-scan parses every page once more, so it can only pay off if some pages
+# of a long statement can be skipped, i.e. attached terms and conditions
+PRESCAN_MIN_PAGES = 10
+
+# Pages are only skipped if they contain neither of these. The text of the
+# pre-scan is not laid out, so lines and spaces can't be relied on.
+RE_SCAN_BOOKING_DATE = re.compile("(?<![0-9.])[0-3][0-9][.][0-1][0-9][.](?![0-9])")
+RE_SCAN_CREATION_DATE = re.compile("erstellt[ ]*am[ ]*[0-3][0-9][.][01][0-9][.]20")
+
+
+def pdf_page_count(filepath: PathLike) -> Optional[int]:
+    """Number of pages of the PDF or None if its structure could not be read"""
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+
+    try:
+        with open(filepath, "rb") as fp:
+            return sum(1 for _ in PDFPage.create_pages(PDFDocument(PDFParser(fp))))
+    except Exception as e:
+        logger.debug(f"Could not count the pages of '{filepath}': {e}")
+        return None
+
+
+class _PageHasBookings(Exception):
+    """Stops the interpretation of a page by the pre-scan once a date was found"""
+
+
+def _might_have_bookings(text: str) -> bool:
+    return bool(RE_SCAN_BOOKING_DATE.search(text) or RE_SCAN_CREATION_DATE.search(text))
+
+
+@lru_cache(maxsize=None)
+def _page_scanner() -> type:
+    """A pdfminer device collecting the decoded strings of a page, nothing else"""
+    from pdfminer.pdfdevice import PDFDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
+
+    class PageScanner(PDFDevice):
+        def __init__(self, manager):
+            super().__init__(manager)
+            self.chunks: List[str] = []
+
+        def render_string(self, textstate, seq, *args):
+            # no character boxes are computed, that is what makes the scan cheap
+            font = textstate.font
+            if font is None:
+                return
+            decoded = []
+            for obj in seq:
+                if not isinstance(obj, bytes):
+                    continue
+                for cid in font.decode(obj):
+                    try:
+                        decoded.append(font.to_unichr(cid))
+                    except PDFUnicodeNotDefined:
+                        decoded.append(f"(cid:{cid})")
+            text = "".join(decoded)
+            if _might_have_bookings(text):
+                raise _PageHasBookings()
+            self.chunks.append(text)
+
+    return PageScanner
+
+
+def booking_pages(filepath: PathLike) -> Optional[List[int]]:
+    """
+    Pages that might contain bookings or the creation date of the statement, and
+    the pages right after them, which might continue their last booking
+
+    The pages are pre-scanned by pdfminer, but only their strings are decoded
+    until the first date is found, which is a lot cheaper than extracting their
+    layout. Returns None if all pages have to be extracted, because the PDF has
+    less than `PRESCAN_MIN_PAGES` pages, no page was skipped or the PDF could
+    not be scanned or decoded.
+    """
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    pages = []
+    try:
+        with open(filepath, "rb") as fp, warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            manager = PDFResourceManager()
+            device = _page_scanner()(manager)
+            interpreter = PDFPageInterpreter(manager, device)
+            document = list(PDFPage.get_pages(fp))
+            count = len(document)
+            if count < PRESCAN_MIN_PAGES:
+                return None
+            for number, page in enumerate(document):
+                device.chunks.clear()
+                try:
+                    interpreter.process_page(page)
+                except _PageHasBookings:
+                    pages.append(number)
+                    continue
+                text = " ".join(device.chunks)
+                if "(cid:" in text:
+                    # the dates of a font pdfminer can't decode are not found
+                    logger.debug(f"Could not decode the pages of '{filepath}'")
+                    return None
+                # a date might be split into several strings, i.e. one per character
+                if _might_have_bookings(text) or _might_have_bookings(
+                    "".join(device.chunks)
+                ):
+                    pages.append(number)
+    except Exception as e:
+        logger.debug(f"Could not scan the pages of '{filepath}': {e}")
+        return None
+    # the last booking of a page can continue on the next page without any date
+    pages = sorted({*pages, *(page + 1 for page in pages if page + 1 < count)})
+    if not pages or len(pages) == count:
+        return None
+    logger.debug(f"Skipping {count - len(pages)} of {count} pages of {filepath}")
+    return pages
+
+
+def booking_pages_cached(
+    filepath: PathLike, cache: Optional[StatementCache] = None
+) -> Optional[List[int]]:
+    """`booking_pages`, reusing cached results"""
+    # imported here, the reader depends on this module
+    from .statement_reader import reader_fingerprint
+
+    if cache is None:
+        return booking_pages(filepath)
+    key = cache.key(filepath, "booking-pages", __version__, reader_fingerprint())
+    data = cache.get(key)
+    if data is not None:
+        return json.loads(data)
+    pages = booking_pages(filepath)
+    cache.put(key, json.dumps(pages).encode("UTF-8"))
+    return pages
+
+
+def page_ranges(pages: int, workers: int) -> List[Tuple[int, int]]:
+    """Split pages into at most workers ranges of at least MIN_PAGES_PER_WORKER"""
+    size = max(MIN_PAGES_PER_WORKER, -(-pages // max(workers, 1)))
+    return [(first, min(first + size, pages)) for first in range(0, pages, size)]
+
+
+def extract_text_parallel(
+    filepath: PathLike,
+    extractor: str,
+    workers: int,
+    pages: Optional[Sequence[int]] = None,
+) -> str:
+    """
+    Extract the text of page ranges of the PDF in parallel and join them
+
+    Both extractors end every page with a form feed, so the result is the same
+    as extracting the whole document (or all given pages) at once.
+    """
+    if pages is None:
+        count = pdf_page_count(filepath)
+        pages = [] if count is None else range(count)
+    parts = [pages[first:last] for first, last in page_ranges(len(pages), workers)]
+    if len(parts) < 2:
+        return _extract(filepath, extractor, None, pages or None)
+    logger.debug(f"Extracting {len(pages)} pages of {filepath} in {len(parts)} parts")
+    # pdfminer is pure python and needs processes, poppler runs in its own ones
+    pool = ProcessPoolExecutor if extractor == "pdfminer" else ThreadPoolExecutor
+    with pool(max_workers=len(parts)) as executor:
+        texts = executor.map(
+            PAGE_EXTRACTORS[extractor], repeat(filepath), map(list, parts)
+        )
+        return "".join(texts)
+
+
+def _extract(
+    filepath: PathLike,
+    extractor: str,
+    page_workers: Optional[int],
+    pages: Optional[Sequence[int]],
+) -> str:
+    if page_workers is not None and page_workers > 1:
+        return extract_text_parallel(filepath, extractor, page_workers, pages)
+    if pages is not None:
+        return PAGE_EXTRACTORS[extractor](filepath, pages)
+    return EXTRACTORS[extractor](filepath)
+
+
+def _text_key(
+    cache: StatementCache,
+    filepath: PathLike,
+    extractor: str,
+    pages: Optional[Sequence[int]],
+) -> str:
+    if pages is None:
+        return cache.key(filepath, extractor)
+    pages_id = ",".join(map(str, pages)).encode("UTF-8")
+    return cache.key(filepath, extractor, hashlib.sha256(pages_id).hexdigest()[:16])
+
+
+def extract_text_cached(
+    filepath: PathLike,
+    extractor: str,
+    cache: Optional[StatementCache] = None,
+    page_workers: Optional[int] = None,
+    pages: Optional[Sequence[int]] = None,
+) -> str:
+    """
+    Extract the text using the given extractor, reusing cached results
+
+    :param page_workers: extract page ranges with that many processes in parallel
+    :param pages: only extract these pages (zero based, sorted), e.g. the ones
+                  found by `booking_pages`
+    """
+    if cache is None:
+        return _extract(filepath, extractor, page_workers, pages)
+    key = _text_key(cache, filepath, extractor, pages)
+    data = cache.get(key)
+    if data is not None:
+        return data.decode("UTF-8")
+    text = _extract(filepath, extractor, page_workers, pages)
+    cache.put(key, text.encode("UTF-8"))
+    return text
+
+
+async def aextract_text_cached(
+    filepath: PathLike,
+    extractor: str,
+    cache: Optional[StatementCache] = None,
+    executor: Optional[Executor] = None,
+    pages: Optional[Sequence[int]] = None,
+) -> str:
+    """
+    Like `extract_text_cached`, but without blocking the event loop
+
+    poppler runs as asynchronous subprocess, the other extractors in executor
+    (the default executor of the loop if None).
+    """
+    # asyncio is only imported by applications using it, as it is slow to import
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    if cache is not None:
+        key = await loop.run_in_executor(
+            None, _text_key, cache, filepath, extractor, pages
+        )
+        data = await loop.run_in_executor(None, cache.get, key)
+        if data is not None:
+            return data.decode("UTF-8")
+    if extractor == "poppler":
+        runs = [(None, None)] if pages is None else _runs(pages)
+        texts = [await _aextract_with_poppler(filepath, *run) for run in runs]
+        text = "".join(texts)
+    else:
+        text = await loop.run_in_executor(
+            executor, _extract, filepath, extractor, None, pages
+        )
+    if cache is not None:
+        await loop.run_in_executor(None, cache.put, key, text.encode("UTF-8"))
+    return text
+
+
+def _font_name(font) -> str:
+    from pdfminer.pdftypes import resolve1
+
+    base_font = resolve1(resolve1(font).get("BaseFont"))
+    return str(getattr(base_font, "name", base_font))
+
+
+def pdf_fingerprint(filepath: PathLike) -> Optional[str]:
+    """
+    Identify the layout family of a PDF without extracting its text
+
+    The fingerprint consists of the producer metadata and the size and fonts of
+    the first page, so statements from the same bank and year share it.
+    Returns None if the PDF structure could not be read.
+    """
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    try:
+        with open(filepath, "rb") as fp:
+            document = PDFDocument(PDFParser(fp))
+            info = resolve1(document.info[0]) if document.info else {}
+            page = next(PDFPage.create_pages(document))
+            fonts = resolve1(page.resources.get("Font")) or {}
+            signature = (
+                resolve1(info.get("Producer")),
+                resolve1(info.get("Creator")),
+                [round(value) for value in page.mediabox],
+                sorted(_font_name(font) for font in fonts.values()),
+            )
+    except Exception as e:
+        logger.debug(f"Could not fingerprint '{filepath}': {e}")
+        return None
+    return hashlib.sha256(repr(signature).encode("UTF-8")).hexdigest()[:16]
+
+
+class ExtractorSelector:
+    """
+    Remember which text extractor works for which kind of PDF
+
+    PDFs are grouped by their `pdf_fingerprint`. For a known group the extractor
+    that worked before is tried first, otherwise pdfminer is tried before poppler.
+
+    `hits` counts per extractor how often the first extractor tried worked and
+    `fallbacks` how often an extractor failed and the next one had to be used.
+    They are updated under a lock, so one selector can be used by several threads.
+    """
+
+    ORDER: Tuple[str, ...] = ("pdfminer", "poppler")
+
+    def __init__(self, known: Optional[Dict[str, str]] = None):
+        self.known: Dict[str, str] = dict(known or {})
+        self.hits: Counter = Counter()
+        self.fallbacks: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def order(
+        self, fingerprint: Optional[str], cache: Optional[StatementCache] = None
+    ) -> Tuple[str, ...]:
+        """Extractors in the order they should be tried for the fingerprint"""
+        preferred = None
+        if fingerprint is not None:
+            with self._lock:
+                preferred = self.known.get(fingerprint)
+            if preferred is None and cache is not None:
+                data = cache.get(f"extractor-{fingerprint}")
+                if data is not None and data.decode("UTF-8") in self.ORDER:
+                    with self._lock:
+                        preferred = self.known.setdefault(
+                            fingerprint, data.decode("UTF-8")
+                        )
+        if preferred is None:
+            return self.ORDER
+        return (preferred,) + tuple(e for e in self.ORDER if e != preferred)
+
+    def succeeded(
+        self,
+        fingerprint: Optional[str],
+        extractor: str,
+        first_try: bool,
+        cache: Optional[StatementCache] = None,
+    ):
+        with self._lock:
+            if first_try:
+                self.hits[extractor] += 1
+            if fingerprint is None or self.known.get(fingerprint) == extractor:
+                return
+            self.known[fingerprint] = extractor
+        if cache is not None:
+            cache.put(f"extractor-{fingerprint}", extractor.encode("UTF-8"))
+
+    def failed(self, extractor: str):
+        with self._lock:
+            self.fallbacks[extractor] += 1
+
+    def update(self, other: "ExtractorSelector"):
+        """Add what other learned, i.e. in another process"""
+        with self._lock:
+            self.known.update(other.known)
+            self.hits.update(other.hits)
+            self.fallbacks.update(other.fallbacks)
+
+
+# Used by `pdf2bookings` if no other selector is given
+extractor_selector = ExtractorSelector()
@@ -0,0 +1,163 @@
+import datetime
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence
+
+from ._optional import require_numpy
+from .exceptions import ParsingError
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+RE_DATE = re.compile("(?P<day>[0-9]{1,2})[.](?P<month>[0-9]{1,2})[.](?P<year>[0-9]{4})")
+RE_VALUE_DATE = re.compile("Wertstellung: [0-9]{2}.[0-9]{2}.")
+# New bank records included strage PN values, so we need to extract them
+RE_PN = re.compile("PN:[ ]*[0-9]{1,10}")
+# Also the refer to the appendix, we don't like that
+RE_APPENDIX = re.compile("(lt.[ ]*)?[ ]*Anlage[ ]*[0-9]+")
+RE_SPACES = re.compile("[ ]+")
+
+
+@lru_cache(maxsize=8192)
+def parse_date(value: str) -> datetime.date:
+    """
+    Parse dates like '31.12.2020'
+
+    Statements contain the same dates over and over, so results are memoised.
+    """
+    match = RE_DATE.fullmatch(value)
+    try:
+        if match is None:
+            raise ValueError("expected format is dd.mm.yyyy")
+        return datetime.date(
+            int(match.group("year")), int(match.group("month")), int(match.group("day"))
+        )
+    except ValueError as e:
+        raise ParsingError(
+            f"Could not parse date from string '{value}', "
+            f"it seems to be invalid: {e}"
+        )
+
+
+@lru_cache(maxsize=1024)
+def normalise_type(value: str) -> str:
+    """
+    Remove value dates, PN numbers and references to the appendix from a type
+
+    Statements only use a few booking types, so results are memoised. Use
+    `normalise_type.cache_info()` to see the hits and misses of the cache.
+    """
+    value = RE_VALUE_DATE.sub("", value).strip()
+    value = RE_PN.sub(" ", value)
+    value = RE_APPENDIX.sub(" ", value)
+    return value.strip()
+
+
+def collapse_spaces(value: str) -> str:
+    """Replace multiple spaces by one"""
+    return RE_SPACES.sub(" ", value)
+
+
+def join_lines(lines: Iterable[str]) -> str:
+    """
+    Join lines with a space, collapse multiple spaces and strip the result
+
+    Gives the same result as appending the lines one by one with
+    `collapse_spaces(f"{text} {line}".strip())`, but in linear time.
+    """
+    return collapse_spaces(" ".join(line.rstrip() for line in lines)).strip()
+
+
+def parse_german_number(value: str) -> float:
+    """Parse numbers like '1.000,00' to float"""
+    # Remove german thousand separator and replace german decimal separator
+    return float(value.replace(".", "").replace(",", "."))
+
+
+def parse_amount_string(amount: str) -> float:
+    """
+    Parse strings like
+     - '1.000,00-'
+     - '1.000,00   S'
+     - '23,23+'
+     - '23,23     H'
+    to the correct amount as float
+    :param amount: The string of an amount
+    :return:
+    """
+    # float ignores the spaces between number and sign
+    value = float(amount[:-1].replace(".", "").replace(",", "."))
+    return -value if amount[-1] in "S-" else value
+
+
+def parse_amounts(
+    amounts: Sequence[str], signs: Optional[Sequence[str]] = None
+) -> "np.ndarray":
+    """
+    Vectorised parsing of a whole column of amounts to a float64 array
+
+    :param amounts: amounts like `parse_amount_string` accepts them, or without
+                    sign if signs are given
+    :param signs: 'S' or 'H' for every amount, like the csv export has them
+    """
+    np = require_numpy()
+    if len(amounts) == 0:
+        return np.empty(0, np.float64)
+    if signs is not None and len(signs) != len(amounts):
+        raise ParsingError(f"Got {len(signs)} signs for {len(amounts)} amounts")
+    try:
+        if signs is None:
+            negative = np.fromiter(
+                (amount.rstrip()[-1] in "S-" for amount in amounts),
+                dtype=bool,
+                count=len(amounts),
+            )
+        else:
+            negative = np.char.strip(np.asarray(signs, dtype=str)) == "S"
+        # clean all numbers at once instead of one by one
+        text = "\n".join(amounts).replace(".", "").replace(",", ".")
+        for sign in "HS+-":
+            text = text.replace(sign, "")
+        result = np.array(text.split("\n"), dtype=np.float64)
+    except (IndexError, ValueError) as e:
+        amount = _first_invalid_amount(amounts, signs is None)
+        raise ParsingError(
+            f"Could not parse amount '{amount}'"
+            if amount is not None
+            else f"Could not parse all amounts: {e}"
+        )
+    result[negative] *= -1
+    return result
+
+
+def _first_invalid_amount(amounts: Sequence[str], signed: bool) -> Optional[str]:
+    """The first amount that can't be parsed one by one, to name it in errors"""
+    for amount in amounts:
+        try:
+            if signed:
+                parse_amount_string(amount.rstrip())
+            else:
+                parse_german_number(amount.strip())
+        except (IndexError, ValueError):
+            return amount
+    return None
+
+
+def parse_dates(dates: Sequence[str]) -> "np.ndarray":
+    """
+    Vectorised parsing of a whole column of dates like '31.12.2020'
+
+    :return: an array of datetime64[D]
+    """
+    np = require_numpy()
+    values = np.asarray(dates, dtype="U10")
+    if len(values) == 0 or not np.all(np.char.str_len(values) == 10):
+        # not all dates are zero padded, parse them one by one
+        return np.array([parse_date(str(value)) for value in values], "datetime64[D]")
+    # reorder the characters of 'dd.mm.yyyy' to 'yyyy-mm-dd'
+    chars = values.view("U1").reshape(-1, 10)[:, [6, 7, 8, 9, 2, 3, 4, 5, 0, 1]]
+    chars[:, [4, 7]] = "-"
+    try:
+        return np.ascontiguousarray(chars).view("U10").ravel().astype("datetime64[D]")
+    except ValueError as e:
+        raise ParsingError(f"Could not parse all dates: {e}")
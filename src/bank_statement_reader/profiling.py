@@ -0,0 +1,171 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import PathLike
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Called with stage name, file name (or None), seconds and number of items
+ProfileCallback = Callable[[str, Optional[str], float, int], None]
+
+
+class StageTiming:
+    """Wall time, calls and processed items accumulated for one stage"""
+
+    __slots__ = ("calls", "seconds", "items")
+
+    def __init__(self, calls: int = 0, seconds: float = 0.0, items: int = 0):
+        self.calls = calls
+        self.seconds = seconds
+        self.items = items
+
+    def add(self, calls: int, seconds: float, items: int):
+        self.calls += calls
+        self.seconds += seconds
+        self.items += items
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "seconds": self.seconds, "items": self.items}
+
+
+class StageRun:
+    """Handed out by `stage`, set `items` to the number of items processed"""
+
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = 0
+
+
+class Profile:
+    """
+    Timings of the stages of reading statements, in total and per file
+
+    Activate it with `profiling`. Besides the stages it records which text
+    extractor was used for each PDF and how often another one had to be tried.
+
+    :param callback: called after every stage with its name, file, seconds and
+                     items, e.g. for progress reports. Stages of other processes
+                     merged with `update` are not reported to it.
+    """
+
+    def __init__(self, callback: Optional[ProfileCallback] = None):
+        self.callback = callback
+        self.stages: Dict[str, StageTiming] = {}
+        self.files: Dict[str, Dict[str, StageTiming]] = {}
+        self.extractors: Dict[str, str] = {}
+        self.fallbacks: Counter = Counter()
+
+    def record(
+        self, name: str, filename: Optional[str], seconds: float, items: int = 0
+    ):
+        self.stages.setdefault(name, StageTiming()).add(1, seconds, items)
+        if filename is not None:
+            file_stages = self.files.setdefault(filename, {})
+            file_stages.setdefault(name, StageTiming()).add(1, seconds, items)
+        if self.callback is not None:
+            self.callback(name, filename, seconds, items)
+
+    def record_extractor(self, filename: str, extractor: str, fallbacks: int):
+        """Note that extractor was used for filename after fallbacks failed ones"""
+        self.extractors[filename] = extractor
+        self.fallbacks[filename] += fallbacks
+
+    def update(self, other: "Profile"):
+        """Add what was recorded by other, i.e. in another process"""
+        for name, timing in other.stages.items():
+            self.stages.setdefault(name, StageTiming()).add(
+                timing.calls, timing.seconds, timing.items
+            )
+        for filename, stages in other.files.items():
+            file_stages = self.files.setdefault(filename, {})
+            for name, timing in stages.items():
+                file_stages.setdefault(name, StageTiming()).add(
+                    timing.calls, timing.seconds, timing.items
+                )
+        self.extractors.update(other.extractors)
+        self.fallbacks.update(other.fallbacks)
+
+    def __getstate__(self):
+        # callbacks are often not picklable and only used by the process set it
+        state = self.__dict__.copy()
+        state["callback"] = None
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: t.to_dict() for name, t in self.stages.items()},
+            "files": {
+                filename: {name: t.to_dict() for name, t in stages.items()}
+                for filename, stages in self.files.items()
+            },
+            "extractors": {
+                "used": dict(Counter(self.extractors.values())),
+                "fallbacks": sum(self.fallbacks.values()),
+                "files": {
+                    filename: {
+                        "extractor": extractor,
+                        "fallbacks": self.fallbacks[filename],
+                    }
+                    for filename, extractor in self.extractors.items()
+                },
+            },
+        }
+
+    def write_json(self, filename: PathLike):
+        with open(filename, "w", encoding="UTF-8") as fp:
+            json.dump(self.to_dict(), fp, indent=2)
+
+
+# The profile recorded into, kept per context so threads and tasks don't mix
+_active_profile = ContextVar("active_profile", default=None)
+
+
+def active_profile() -> Optional[Profile]:
+    return _active_profile.get()
+
+
+@contextmanager
+def profiling(profile: Optional[Profile] = None) -> Iterator[Profile]:
+    """
+    Record the stages of everything read within the context into profile
+
+    >>> with profiling() as profile:
+    ...     bookings = files2booking(files)
+    >>> profile.write_json("profile.json")
+    """
+    if profile is None:
+        profile = Profile()
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+@contextmanager
+def stage(name: str, filename: Optional[PathLike] = None) -> Iterator[StageRun]:
+    """Time the code within the context as stage name, if profiling is active"""
+    run = StageRun()
+    profile = _active_profile.get()
+    if profile is None:
+        yield run
+        return
+    start = time.perf_counter()
+    try:
+        yield run
+    finally:
+        profile.record(
+            name,
+            None if filename is None else str(filename),
+            time.perf_counter() - start,
+            run.items,
+        )
+
+
+def record_extractor(filename: PathLike, extractor: str, fallbacks: int):
+    """Note the extractor used for filename, if profiling is active"""
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.record_extractor(str(filename), extractor, fallbacks)
@@ -0,0 +1,140 @@
+import datetime
+import json
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from .booking import Booking
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .bookings import Bookings
+
+
+class _Labels:
+    """Distinct strings of a column and the code of each of them"""
+
+    def __init__(self):
+        self.labels: List[Optional[str]] = []
+        self.codes: Dict[Optional[str], int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+
+class BookingRecords:
+    """
+    Memory lean store of bookings, keeping each field in a parallel array
+
+    Dates are stored as ordinals and amounts as doubles in `array`s, type, payee
+    and category as codes into lists of their distinct values. Only the comments
+    are kept as one string per booking. Bookings are created on access, so
+    they can be used like the ones of `Bookings`, but changing them does not
+    change the store.
+    """
+
+    def __init__(self, bookings: Iterable[Booking] = ()):
+        self._dates = array("l")
+        self._amounts = array("d")
+        self._types = array("l")
+        self._payees = array("l")
+        self._categories = array("l")
+        self._comments: List[str] = []
+        self._type_labels = _Labels()
+        self._payee_labels = _Labels()
+        self._category_labels = _Labels()
+        self.extend(bookings)
+
+    def append(self, booking: Booking):
+        self._dates.append(booking.date.toordinal())
+        self._amounts.append(booking.amount)
+        self._types.append(self._type_labels.code(booking.type))
+        self._payees.append(self._payee_labels.code(booking.payee))
+        self._categories.append(self._category_labels.code(booking.category))
+        self._comments.append(booking.comment)
+
+    def extend(self, bookings: Iterable[Booking]):
+        for booking in bookings:
+            self.append(booking)
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def __getitem__(self, index: int) -> Booking:
+        return Booking.from_record(
+            date=datetime.date.fromordinal(self._dates[index]),
+            type=self._type_labels.labels[self._types[index]],
+            amount=self._amounts[index],
+            payee=self._payee_labels.labels[self._payees[index]],
+            comment=self._comments[index],
+            category=self._category_labels.labels[self._categories[index]],
+        )
+
+    def __iter__(self) -> Iterator[Booking]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_json(self) -> str:
+        """
+        The records as JSON, e.g. to store them without pickle, see `from_json`
+        """
+        return json.dumps(
+            {
+                "dates": self._dates.tolist(),
+                "amounts": self._amounts.tolist(),
+                "types": [self._type_labels.labels, self._types.tolist()],
+                "payees": [self._payee_labels.labels, self._payees.tolist()],
+                "categories": [
+                    self._category_labels.labels,
+                    self._categories.tolist(),
+                ],
+                "comments": self._comments,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> "BookingRecords":
+        """Records written by `to_json`, raises ValueError if data is invalid"""
+        try:
+            columns = json.loads(data)
+            records = cls()
+            records._dates = array("l", columns["dates"])
+            records._amounts = array("d", columns["amounts"])
+            for name, codes, labels in (
+                ("types", "_types", records._type_labels),
+                ("payees", "_payees", records._payee_labels),
+                ("categories", "_categories", records._category_labels),
+            ):
+                labels.labels, values = columns[name]
+                labels.codes = {label: code for code, label in enumerate(labels.labels)}
+                if values and not 0 <= min(values) <= max(values) < len(labels.labels):
+                    raise ValueError(f"Invalid codes of the {name}")
+                setattr(records, codes, array("l", values))
+            records._comments = [str(comment) for comment in columns["comments"]]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid booking records: {e!r}")
+        lengths = {
+            len(column)
+            for column in (
+                records._dates,
+                records._amounts,
+                records._types,
+                records._payees,
+                records._categories,
+                records._comments,
+            )
+        }
+        if len(lengths) > 1:
+            raise ValueError("The columns of the booking records differ in length")
+        return records
+
+    def to_bookings(self) -> "Bookings":
+        from .bookings import Bookings
+
+        bookings = Bookings()
+        bookings.extend(self, ignore_duplicates=False)
+        return bookings
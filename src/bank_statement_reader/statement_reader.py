@@ -1,21 +1,54 @@
 import csv
+import hashlib
 import re
-import subprocess
-import warnings
-from logging import getLogger
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from importlib import import_module
+from itertools import chain, islice
+from logging import DEBUG, getLogger
 from os import PathLike
 from pathlib import Path
-from typing import List, Tuple
-
-from pdfminer.high_level import extract_text
-from pdfminer.pdfdocument import PDFTextExtractionNotAllowedWarning
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Match,
+    Optional,
+    Tuple,
+)
 
+from . import __version__
 from .booking import Booking
 from .bookings import Bookings
+from .cache import StatementCache
 from .exceptions import ParsingError, UnableToExtractDate
+from .extraction import (
+    ExtractorSelector,
+    booking_pages_cached,
+    extract_text_cached,
+    extractor_selector,
+    pdf_fingerprint,
+)
+from .parsing import join_lines, parse_amount_string, parse_german_number
+from .profiling import Profile, active_profile, profiling, record_extractor, stage
+from .records import BookingRecords
 
 logger = getLogger("bank_statement_reader.reader")
 
+# Modules of the package whose changes invalidate cached bookings, the booking
+# classes are covered by `BookingBase.rules_fingerprint`
+READER_MODULES = (
+    "statement_reader",
+    "extraction",
+    "parsing",
+    "bookings",
+    "records",
+    "booking.rules",
+)
+
 RE_BOOKING_LINE_START = re.compile("^[ \t]*[0-3][0-9][.][0-1][0-9].[ \t]+")
 
 RE_BOOKING_LINE = re.compile(
@@ -29,101 +62,226 @@ RE_CREATION_YEAR = re.compile(
     "erstellt[ ]+am[ ]+[0-3][0-9][.][01][0-9].(?P<year>20[0-9][0-9])"
 )
 
+# The line breaks of `str.splitlines` besides "\n", "\r\n" has to be first
+LINE_BREAKS = (
+    "\r\n",
+    "\r",
+    "\v",
+    "\f",
+    "\x1c",
+    "\x1d",
+    "\x1e",
+    "\x85",
+    "\u2028",
+    "\u2029",
+)
+_DATE = "[0-3][0-9][.][0-1][0-9].[ \t]"
+# A line following the first line of a booking, i.e. an indented line neither
+# starting with a date nor consisting of separator characters only.
+# The first alternative is a shortcut for the usual lines starting with a letter.
+_FOLLOWING_LINE = rf"\n[ ][ \t]*[^\W\d_].*|\n(?![ \t]*{_DATE})(?![ _\t-]*$)[ ].*"
+
+# Finds every booking and the creation year in one pass over the statement
+# text prepared by `_scan_text`, the bookings being the lines `iter_booking_lines`
+# returns. Each match starts at a line break, so the search can skip the rest.
+RE_STATEMENT = re.compile(
+    rf"\n[ \t]*(?={_DATE})(?:"
+    # the fields of `RE_BOOKING_LINE`
+    r"(?P<date1>[0-9]{2}[.][0-9]{2}[.])"
+    r"([ ]+(?P<date2>[0-9]{2}[.][0-9]{2}[.]))?"
+    r"[ ]*(?P<type>.+?)[ ]+"
+    r"(?P<amount>[0-9,.]+[ ]*[HS+-])[^\S\n]*$"
+    # or a line starting with a date that is no booking, like a summary
+    r"|(?P<header>.*)"
+    rf")(?P<body>(?:{_FOLLOWING_LINE})*)"
+    r"|erstellt[ ]+am[ ]+[0-3][0-9][.][01][0-9].(?P<year>20[0-9][0-9])",
+    re.MULTILINE,
+)
+
 
-def parse_amount_string(amount: str) -> float:
+def cached_bookings(
+    filepath: PathLike,
+    cache: Optional[StatementCache],
+    read: Callable[[PathLike], Bookings],
+) -> Bookings:
     """
-    Parse strings like
-     - '1.000,00-'
-     - '1.000,00   S'
-     - '23,23+'
-     - '23,23     H'
-    to the correct amount as float
-    :param amount: The string of an amount
-    :return:
+    Return the bookings read from filepath before or read them now and cache them
+
+    Entries are only reused for the same file content, package version, source
+    of the reader (see `reader_fingerprint`) and booking rules and classes
+    (see `BookingBase.rules_fingerprint`).
     """
-    # Replace H and S
-    amount = amount.replace("H", "+").replace("S", "-")
-    # Remove german thousand separator
-    amount = amount.replace(".", "")
-    # Replace german decimal separator with english
-    amount = amount.replace(",", ".")
-    # Put the sign at the correct place and trim
-    amount = amount[-1] + amount[:-1].strip()
-    return float(amount)
+    if cache is None:
+        return read(filepath)
+    key, bookings = _load_cached_bookings(filepath, cache)
+    if bookings is None:
+        bookings = read(filepath)
+        _store_cached_bookings(cache, key, bookings)
+    return bookings
 
 
-def csv2bookings(filename) -> Bookings:
+@lru_cache(maxsize=None)
+def reader_fingerprint() -> str:
+    """Hash of the source of the modules turning statements into bookings"""
+    sha = hashlib.sha256()
+    for name in READER_MODULES:
+        module = import_module(f".{name}", __package__)
+        with open(module.__file__, "rb") as fp:
+            sha.update(fp.read())
+    return sha.hexdigest()[:16]
+
+
+def _store_cached_bookings(cache: StatementCache, key: str, bookings: Bookings):
+    """Cache the bookings as plain JSON records, see `_load_cached_bookings`"""
+    cache.put(key, bookings.to_records().to_json().encode("UTF-8"))
+
+
+def _load_cached_bookings(
+    filepath: PathLike, cache: StatementCache
+) -> Tuple[str, Optional[Bookings]]:
+    """The cache key of the bookings of filepath and the bookings if cached"""
+    key = cache.key(
+        filepath,
+        "bookings",
+        __version__,
+        reader_fingerprint(),
+        Booking.rules_fingerprint(),
+    )
+    data = cache.get(key)
+    if data is not None:
+        try:
+            with stage("cache.load", filepath) as run:
+                records = BookingRecords.from_json(data.decode("UTF-8"))
+                bookings = records.to_bookings()
+                run.items = len(bookings)
+            return key, bookings
+        except Exception as e:
+            logger.warning(f"Ignoring invalid cached bookings of '{filepath}': {e}")
+    return key, None
+
+
+def csv2bookings(filename, cache: Optional[StatementCache] = None) -> Bookings:
     """
     Reads an GLS export (new version) and creates a bookings file
     """
-    headers = list()
+    return cached_bookings(filename, cache, _read_csv)
+
+
+def _read_csv(filename) -> Bookings:
     bookings = Bookings()
-    ignored_lines = list()
-    ignore_rest: bool = False
+    with stage("csv", filename) as run:
+        bookings.extend(iter_csv_bookings(filename), ignore_duplicates=False)
+        run.items = len(bookings)
+    return bookings
+
+
+def iter_csv_bookings(filename) -> Iterator[Booking]:
+    """
+    Read the bookings of a GLS export (new version) one by one
+
+    The positions of the columns are looked up once in the header row, the rows
+    are read by position. Only the current row is kept, so exports of any size
+    can be streamed, also in batches with `iter_booking_batches`.
+    """
     with open(filename, newline="", encoding="latin-1") as csvfile:
-        spamreader = csv.reader(csvfile, delimiter=";", quotechar='"')
-        for row in spamreader:
-            if ignore_rest:
-                ignored_lines.append(";".join(row))
-            elif len(headers) > 1:
-                if len(row) != len(headers):
-                    ignore_rest = True
-                    ignored_lines.append(";".join(row))
-                    continue
-                result = dict()
-                booking = Booking()
-                for cell, header in zip(row, headers):
-                    result[header] = cell
-
-                # Comment has to be set first as it is used to determine Payee as well
-                comment = result.get("Vorgang/Verwendungszweck").split("\n")
-                booking.comment = "\n".join(comment[1:])
-                booking.date = result.get("Buchungstag")
-                booking.type = comment[0]
-                multiply = -1 if result.get("HS") == "S" else 1
-                booking.amount = (
-                    float(result.get("Umsatz").replace(".", "").replace(",", "."))
-                    * multiply
-                )
-                booking.payee = result.get("Empfänger/Zahlungspflichtiger")
-                bookings.append(booking, ignore_duplicates=False)
-            elif len(row) > 0 and row[0] == "Buchungstag":
-                # Read Headers
-                for cell in row:
-                    headers.append(cell)
-                    if cell == "Umsatz":
-                        headers.append("HS")
-                        break
-        if ignored_lines:
-            logger.debug("Ignored lines: " + "\n".join(ignored_lines))
+        rows = csv.reader(csvfile, delimiter=";", quotechar='"')
+        for row in rows:
+            if len(row) > 0 and row[0] == "Buchungstag":
+                width, date, payee, purpose, amount = _csv_columns(row, filename)
+                break
+        else:
+            return
+        for row in rows:
+            # the bookings end with the first row of another length
+            if len(row) != width:
+                if logger.isEnabledFor(DEBUG):
+                    for line in chain([row], rows):
+                        logger.debug("Ignored line: " + ";".join(line))
+                return
+            booking = Booking()
+            # Comment has to be set first as it is used to determine Payee as well
+            booking_type, _, comment = row[purpose].partition("\n")
+            booking.comment = comment
+            booking.date = row[date]
+            booking.type = booking_type
+            multiply = -1 if row[amount + 1] == "S" else 1
+            booking.amount = parse_german_number(row[amount]) * multiply
+            booking.payee = row[payee]
+            yield booking
+
+
+def _csv_columns(header: List[str], filename) -> Tuple[int, int, int, int, int]:
+    """
+    Number of cells of a booking row and the positions of the date, payee,
+    purpose and amount columns of a GLS export. The amount is followed by its
+    sign ("H" or "S") in a column without header.
+    """
+    try:
+        amount = header.index("Umsatz")
+        return (
+            amount + 2,
+            header.index("Buchungstag"),
+            header.index("Empfänger/Zahlungspflichtiger"),
+            header.index("Vorgang/Verwendungszweck"),
+            amount,
+        )
+    except ValueError as e:
+        raise ParsingError(f"Missing column in the header of '{filename}': {e}")
+
+
+def iter_booking_batches(
+    bookings: Iterable[Booking], size: int = 10_000
+) -> Iterator[List[Booking]]:
+    """
+    Group the bookings into lists of size bookings, the last one may be shorter
+
+    >>> for batch in iter_booking_batches(iter_bookings(files)):
+    ...     database.insert(batch)
+    """
+    if size < 1:
+        raise ValueError(f"The batch size has to be positive, not {size}")
+    bookings = iter(bookings)
+    batch = list(islice(bookings, size))
+    while batch:
+        yield batch
+        batch = list(islice(bookings, size))
+
+
+def data2booking(data: Iterable[str], year: str) -> Bookings:
+    bookings = Bookings()
+    bookings.extend(iter_data_bookings(data, year), ignore_duplicates=False)
     return bookings
 
 
-def data2booking(data: List[str], year: str) -> Bookings:
+def iter_data_bookings(data: Iterable[str], year: str) -> Iterator[Booking]:
+    """
+    Create the bookings from booking lines (see `pdf2data_and_year`) one by one
+
+    :param data: booking lines, new bookings start without indentation
+    :param year: the year of the bookings
+    """
     # Last line can not start with space and needs to be unique
     LAST_LINE = "%%%$$LAST$$%%%"
 
     booking = None
-    bookings = Bookings()
     next_is_payee = False
     payee = None
+    comment_lines: List[str] = []
     # Make sure the last entry is empty so also the last booking is added
-    data.append(LAST_LINE)
-    for line in data:
+    for line in chain(data, [LAST_LINE]):
         line = line.replace("\n", "")
         if not line:
             continue
         # Check for new entry
         if line[0] != " ":
             if booking:
-                # Set payee just in the end, as we need the comment to be
-                # read complete before
-                # print(f"Comment: {booking.comment}")
+                # Set comment and payee just in the end, as the payee rules
+                # need the comment to be read complete before
+                booking.comment = join_lines(comment_lines)
                 booking.payee = payee
-                bookings.append(booking, ignore_duplicates=False)
-                if line == LAST_LINE:
-                    break
-            booking = Booking()
+                yield booking
+            if line == LAST_LINE:
+                break
             # noqa: E501
             """
             Example for new file
@@ -142,6 +300,9 @@ def data2booking(data: List[str], year: str) -> Bookings:
                     logger.info(
                         f"Ignoring line '{line}' as it seems to be only a summary"
                     )
+                    # also ignore the lines belonging to the summary
+                    booking = None
+                    next_is_payee = False
                     continue
                 else:
                     raise ParsingError(
@@ -149,23 +310,28 @@ def data2booking(data: List[str], year: str) -> Bookings:
                         f"  '{line}'\n"
                         f"It seem not to follow the format of a typical bank report"
                     )
+            booking = Booking()
             matches = matches.groupdict()
             date = matches["date1"]
             booking.date = f"{date}{year}"
             booking.type = matches["type"].strip()
             booking.amount = parse_amount_string(matches["amount"])
-            booking.comment = ""
+            comment_lines = []
             next_is_payee = True
+        elif booking is None:
+            continue
         elif next_is_payee:
             next_is_payee = False
             payee = line.strip()
-            # print(f"Payee: {payee}")
         else:
-            booking.comment = f"{booking.comment} {line}".strip()
-    return bookings
+            comment_lines.append(line)
 
 
-def get_pdf_text_with_layout(filepath: PathLike, force_poppler: bool = False) -> str:
+def get_pdf_text_with_layout(
+    filepath: PathLike,
+    force_poppler: bool = False,
+    cache: Optional[StatementCache] = None,
+) -> str:
     """
     Extract the layout like text from the PDF, either using pdfminer.six (python only)
     or pdftotext from poppler.
@@ -176,24 +342,26 @@ def get_pdf_text_with_layout(filepath: PathLike, force_poppler: bool = False) ->
 
     :param filepath:
     :param force_poppler:
+    :param cache: reuse text extracted from a file with the same content before
     :return:
     """
     if not force_poppler:
-        with warnings.catch_warnings():
-            # Ignore warning that text extraction is not allowed by the PDF
-            warnings.filterwarnings(
-                "ignore", category=PDFTextExtractionNotAllowedWarning
-            )
-            text = extract_text(filepath)
+        text = extract_text_cached(filepath, "pdfminer", cache)
         if len(text.splitlines()) > 10:
             return text
     logger.debug("Using poppler to extract text.")
-    result = subprocess.run(
-        ["pdftotext", "-layout", filepath, "-"],
-        stderr=subprocess.DEVNULL,
-        stdout=subprocess.PIPE,
-    )
-    return result.stdout.decode("UTF-8")
+    return extract_text_cached(filepath, "poppler", cache)
+
+
+def _scan_text(text: str) -> str:
+    """
+    The text with "\\n" as only line break, so `RE_STATEMENT` finds the same lines
+    as `str.splitlines`, and a leading "\\n" so also the first line starts with one
+    """
+    for line_break in LINE_BREAKS:
+        if line_break in text:
+            text = text.replace(line_break, "\n")
+    return "\n" + text
 
 
 def pdf2data_and_year(text: str, filepath: PathLike) -> Tuple[List[str], str]:
@@ -203,73 +371,335 @@ def pdf2data_and_year(text: str, filepath: PathLike) -> Tuple[List[str], str]:
     :param filepath: Only for sane error reporting
     :return: List of bookings, year of the bookings
     """
-    # Extract the creation date to get the correct year for the entries
+    lines: List[str] = []
+    year = None
+    for match in RE_STATEMENT.finditer(_scan_text(text)):
+        if match.lastgroup != "year":
+            lines += _booking_lines(match)
+        elif year is None:
+            year = match["year"]
+    if year is None:
+        # not found outside the bookings, so either inside one or not at all
+        year = extract_year(text, filepath)
+    return lines, year
+
+
+def extract_year(text: str, filepath: PathLike) -> str:
+    """
+    Extract the creation date to get the correct year for the entries
+    :param text: the text of the statement
+    :param filepath: Only for sane error reporting
+    """
     try:
         match = next(RE_CREATION_YEAR.finditer(text))
     except StopIteration:
         raise UnableToExtractDate(f"Could not extract creation date from '{filepath}'.")
     else:
-        year = match.groupdict()["year"]
-
-    # Now extract all booking values
-    lines: List[str] = text.splitlines()
-    # booking values
-    data: List[str] = []
-
-    beginning_found = False
-    for line in lines:
-        do_append = False
-        # Every booking should start with a data
-        if RE_BOOKING_LINE_START.match(line) is not None:
-            beginning_found = True
-            do_append = True
-            line = line.strip()
-        # followed by indented lines
-        elif beginning_found and len(line) > 0 and line[0] == " ":
-            if RE_SEPARATOR_LINE.fullmatch(line) is None:
-                do_append = True
-            else:
-                # but if this indented lines only consists of separator characters
-                # it is probably the end of booking section
-                beginning_found = False
-        else:
-            beginning_found = False
-            do_append = False
+        return match.groupdict()["year"]
 
-        if do_append:
-            # Only strip the right as the front is used to determine th
-            data.append(line.rstrip())
-    return data, year
 
+def iter_booking_lines(text: str) -> Iterator[str]:
+    """
+    Extract all booking lines from the text of a statement one by one
+
+    Every booking starts with a line beginning with a date, followed by
+    indented lines. The indentation of the following lines is kept.
+    """
+    for match in RE_STATEMENT.finditer(_scan_text(text)):
+        if match.lastgroup != "year":
+            yield from _booking_lines(match)
 
-def pdf2bookings(filepath: PathLike) -> Bookings:
+
+def _booking_lines(match: Match) -> List[str]:
+    """The stripped first line and right stripped following lines of a booking"""
+    lines = match["body"].split("\n")
+    lines[0] = match.string[match.start() : match.start("body")].strip()
+    return [line.rstrip() for line in lines]
+
+
+def iter_text_bookings(text: str, year: str) -> Iterator[Booking]:
+    """
+    Create the bookings of the text of a statement one by one
+
+    Gives the same bookings as `iter_data_bookings` of the `iter_booking_lines`,
+    but the text is not split into lines: the fields are taken from the matches
+    of a single scan of the text.
+
+    :param text: the text of the statement
+    :param year: the year of the bookings
+    """
+    payee = None
+    for match in RE_STATEMENT.finditer(_scan_text(text)):
+        if match.lastgroup == "year":
+            continue
+        if match["date1"] is None:
+            line = match["header"].strip()
+            if "Anlage" in line:
+                logger.info(f"Ignoring line '{line}' as it seems to be only a summary")
+                continue
+            raise ParsingError(
+                f"Could not parse the line: \n"
+                f"  '{line}'\n"
+                f"It seem not to follow the format of a typical bank report"
+            )
+        lines = list(filter(None, map(str.rstrip, match["body"].split("\n"))))
+        booking = Booking()
+        booking.date = f"{match['date1']}{year}"
+        booking.type = match["type"].strip()
+        booking.amount = parse_amount_string(match["amount"])
+        # like in `iter_data_bookings` a booking without lines keeps the payee
+        if lines:
+            payee = lines[0].strip()
+        booking.comment = join_lines(lines[1:])
+        booking.payee = payee
+        yield booking
+
+
+def pdf2bookings(
+    filepath: PathLike,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+    page_workers: Optional[int] = None,
+    prescan: bool = False,
+) -> Bookings:
+    """
+    Read the bookings of a PDF statement
+
+    :param filepath: the statement to read
+    :param cache: reuse bookings and text read from files with the same content
+    :param selector: remembers which extractor works for which kind of PDF,
+                     defaults to the module wide `extractor_selector`
+    :param page_workers: extract the text of long statements with that many
+                         processes in parallel, each reading a range of pages,
+                         the pages are not pre-scanned then
+    :param prescan: skip the pages of long statements without bookings, i.e.
+                    attached terms, found by a cheaper pass over all pages
+    """
+    return cached_bookings(
+        filepath,
+        cache,
+        partial(
+            _read_pdf,
+            cache=cache,
+            selector=selector,
+            page_workers=page_workers,
+            prescan=prescan,
+        ),
+    )
+
+
+def _read_pdf(
+    filepath: PathLike,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+    page_workers: Optional[int] = None,
+    prescan: bool = False,
+) -> Bookings:
+    text, year = _pdf_text_and_year(filepath, cache, selector, page_workers, prescan)
+    return _text2bookings(text, year, filepath)
+
+
+def _text2bookings(text: str, year: str, filepath: PathLike) -> Bookings:
+    """Bookings of the text extracted from the PDF filepath"""
+    bookings = Bookings()
+    with stage("bookings", filepath) as run:
+        bookings.extend(iter_text_bookings(text, year), ignore_duplicates=False)
+        run.items = len(bookings)
+    return bookings
+
+
+def iter_pdf_bookings(
+    filepath: PathLike,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+) -> Iterator[Booking]:
+    """
+    Read the bookings of a PDF statement one by one, see `pdf2bookings`
+    """
+    text, year = _pdf_text_and_year(filepath, cache, selector)
+    return iter_text_bookings(text, year)
+
+
+def _pdf_text_and_year(
+    filepath: PathLike,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+    page_workers: Optional[int] = None,
+    prescan: bool = False,
+) -> Tuple[str, str]:
+    """Extract the text of the PDF with the first extractor that works for it"""
     logger.debug(f"Reading {filepath}")
-    try:
-        text = get_pdf_text_with_layout(filepath)
-        return data2booking(*pdf2data_and_year(text, filepath))
-    except UnableToExtractDate:
-        # Try again but force the use of poppler
-        text = get_pdf_text_with_layout(filepath, True)
-        return data2booking(*pdf2data_and_year(text, filepath))
+    if selector is None:
+        selector = extractor_selector
+    with stage("fingerprint", filepath):
+        fingerprint = pdf_fingerprint(filepath)
+    pages = None
+    # the pre-scan interprets all pages before the page workers could start
+    if prescan and (page_workers is None or page_workers <= 1):
+        with stage("prescan", filepath) as run:
+            pages = booking_pages_cached(filepath, cache)
+            run.items = 0 if pages is None else len(pages)
+    extractors = selector.order(fingerprint, cache)
+    for number, extractor in enumerate(extractors, 1):
+        is_last = number == len(extractors)
+        with stage(f"extract.{extractor}", filepath) as run:
+            text = extract_text_cached(filepath, extractor, cache, page_workers, pages)
+            run.items = len(text)
+        year = _year_if_usable(text, filepath, is_last)
+        if year is not None:
+            selector.succeeded(fingerprint, extractor, number == 1, cache)
+            record_extractor(filepath, extractor, fallbacks=number - 1)
+            return text, year
+        logger.debug(f"Extracting text with {extractor} failed for {filepath}")
+        selector.failed(extractor)
+
+
+def _year_if_usable(text: str, filepath: PathLike, is_last: bool) -> Optional[str]:
+    """
+    Year of the bookings in the extracted text or None if the extractor could not
+    handle the PDF. If is_last, the text is used anyway.
+    """
+    # Too short texts mean the extractor could not handle the PDF
+    if is_last or len(text.splitlines()) > 10:
+        try:
+            return extract_year(text, filepath)
+        except UnableToExtractDate:
+            if is_last:
+                raise
+    return None
 
 
 def txt2bookings(filepath, year) -> Bookings:
+    bookings = Bookings()
+    bookings.extend(iter_txt_bookings(filepath, year), ignore_duplicates=False)
+    return bookings
+
+
+def iter_txt_bookings(filepath, year) -> Iterator[Booking]:
+    """
+    Read the bookings of a text file containing booking lines one by one
+    """
     with open(filepath, "r", encoding="UTF-8") as fp:
-        data = fp.readlines()
-    return data2booking(data, year)
+        yield from iter_data_bookings(fp, year)
 
 
-def files2booking(files: List[Path]) -> Bookings:
-    bookings = Bookings()
+def iter_bookings(
+    files: Iterable[PathLike], cache: Optional[StatementCache] = None
+) -> Iterator[Booking]:
+    """
+    Read the bookings of all given pdf and csv statements one by one
 
-    for filename in files:
-        if filename.suffix.lower() == ".pdf":
-            bookings = bookings + pdf2bookings(filename)
-        elif filename.suffix.lower() == ".csv":
-            bookings = bookings + csv2bookings(filename)
+    Unlike `files2booking` the bookings are neither sorted nor checked for
+    duplicates, but they are available immediately and memory use does not
+    grow with the number of bookings.
+
+    :param files: pdf and csv files to read, all other files are ignored
+    :param cache: reuse text extracted from PDFs with the same content
+    """
+    for filename in _statement_files(files):
+        with _naming_file(filename):
+            if filename.suffix.lower() == ".pdf":
+                yield from iter_pdf_bookings(filename, cache)
+            else:
+                yield from iter_csv_bookings(filename)
+
+
+def _statement_files(files: Iterable[PathLike]) -> List[Path]:
+    """The pdf and csv statements of files, all other files are ignored"""
+    statements = []
+    for filename in map(Path, files):
+        if filename.suffix.lower() in (".pdf", ".csv"):
+            statements.append(filename)
         else:
             logger.warning(
                 f'Ignoring "{filename}": Only csv and pdf files are supported'
             )
+    return statements
 
+
+@contextmanager
+def _naming_file(filename: Path) -> Iterator[None]:
+    """Name the statement in parsing errors raised within the context"""
+    try:
+        yield
+    except ParsingError as e:
+        raise type(e)(f"Failed to read '{filename}': {e}") from e
+
+
+def _file2bookings(
+    filename: Path,
+    cache: Optional[StatementCache] = None,
+    selector: Optional[ExtractorSelector] = None,
+    page_workers: Optional[int] = None,
+) -> Bookings:
+    """Read a single pdf or csv statement, naming the file if parsing fails"""
+    with _naming_file(filename):
+        if filename.suffix.lower() == ".pdf":
+            return pdf2bookings(
+                filename, cache=cache, selector=selector, page_workers=page_workers
+            )
+        return csv2bookings(filename, cache=cache)
+
+
+def _file2bookings_in_worker(
+    filename: Path,
+    cache: Optional[StatementCache],
+    known: Dict[str, str],
+    profile: bool = False,
+) -> Tuple[Bookings, ExtractorSelector, Optional[Profile]]:
+    """
+    Read a statement and return what was learned about the extractors as well
+
+    :param profile: also return the stages of reading the statement
+    """
+    selector = ExtractorSelector(known)
+    if not profile:
+        return _file2bookings(filename, cache, selector), selector, None
+    with profiling() as worker_profile:
+        bookings = _file2bookings(filename, cache, selector)
+    return bookings, selector, worker_profile
+
+
+def files2booking(
+    files: List[Path],
+    workers: Optional[int] = None,
+    cache: Optional[StatementCache] = None,
+) -> Bookings:
+    """
+    Read all given statements and merge them into one Bookings object
+
+    :param files: pdf and csv files to read, all other files are ignored
+    :param workers: read the files in parallel using that many processes,
+                    by default the files are read one after another. A single
+                    PDF is split into page ranges read in parallel instead.
+    :param cache: reuse bookings and text read from files with the same content
+    :return: the merged bookings, independent of the number of workers
+    """
+    statements = _statement_files(files)
+
+    if workers is not None and workers > 1 and len(statements) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map keeps the order of the files, so merging gives the same result
+            profile = active_profile()
+            read = partial(
+                _file2bookings_in_worker,
+                cache=cache,
+                known=extractor_selector.known,
+                profile=profile is not None,
+            )
+            collections = []
+            for bookings, selector, worker_profile in executor.map(read, statements):
+                collections.append(bookings)
+                extractor_selector.update(selector)
+                if worker_profile is not None:
+                    profile.update(worker_profile)
+    else:
+        collections = [
+            _file2bookings(filename, cache, page_workers=workers)
+            for filename in statements
+        ]
+
+    with stage("merge") as run:
+        bookings = Bookings.merge(*collections)
+        run.items = len(bookings)
     return bookings
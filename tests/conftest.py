@@ -1,10 +1,112 @@
 """
-Dummy conftest.py for bank_statement_reader.
+conftest.py for bank_statement_reader.
 
-If you don't know what this is for, just leave it empty.
 Read more about conftest.py under:
 - https://docs.pytest.org/en/stable/fixture.html
 - https://docs.pytest.org/en/stable/writing_plugins.html
 """
 
-# import pytest
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from bank_statement_reader import Booking
+
+# the tests write PDFs like the statement generator of the benchmarks
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+from statement_generator import pdf_bytes  # noqa: E402
+
+
+@pytest.fixture
+def make_booking():
+    """Factory for bookings with sane defaults"""
+
+    def _make_booking(
+        day: date = date(2020, 1, 1),
+        amount: float = -10.0,
+        payee: str = "Max Mustermann",
+        comment: str = "Rechnung 1",
+        type_: str = "Überweisungsauftrag",
+    ) -> Booking:
+        booking = Booking()
+        booking.date = day
+        booking.type = type_
+        booking.amount = amount
+        booking.comment = comment
+        booking.payee = payee
+        return booking
+
+    return _make_booking
+
+
+CSV_HEADER = [
+    "Buchungstag",
+    "Valuta",
+    "Empfänger/Zahlungspflichtiger",
+    "IBAN",
+    "BIC",
+    "Vorgang/Verwendungszweck",
+    "Währung",
+    "Umsatz",
+    "",
+]
+
+
+@pytest.fixture
+def write_csv_statement(tmp_path):
+    """Write a statement in the format of the GLS csv export"""
+
+    def _write_csv_statement(name: str, rows) -> Path:
+        """
+        :param rows: tuples of (date string, payee, type and comment, amount, S/H)
+        """
+        lines = ["Umsätze;;;;;;;;", ";;;;;;;;", ";".join(CSV_HEADER)]
+        for day, payee, purpose, amount, sign in rows:
+            lines.append(
+                f'{day};{day};{payee};DE00;GENODEM1GLS;"{purpose}";EUR;{amount};{sign}'
+            )
+        lines.append("")
+        lines.append("Kontostand;1.000,00;H")
+        filename = tmp_path / name
+        filename.write_text("\n".join(lines), encoding="latin-1")
+        return filename
+
+    return _write_csv_statement
+
+
+STATEMENT_TEXT = """
+GLS Gemeinschaftsbank eG                                  Kontoauszug 1/2020
+Max Mustermann                               erstellt am 05.02.2020
+
+Bu-Tag  Wert   Vorgang                                            Betrag EUR
+02.01.  01.01. Überweisungsgutschr.                                1.000,00 H
+               Arbeitgeber GmbH
+               Gehalt Januar
+               2020
+03.01.  03.01. Kartenzahlung girocard                                 23,50 S
+               REWE Markt
+               REWE SAGT DANKE 12345
+   ____________________________________________________________________________
+                                            neuer Kontostand          976,50 H
+Anlage zum Kontoauszug
+"""
+
+
+@pytest.fixture
+def statement_text() -> str:
+    """Text of a statement as extracted by `pdftotext -layout`"""
+    return STATEMENT_TEXT
+
+
+@pytest.fixture
+def write_pdf(tmp_path):
+    """Write a simple PDF, pages are given as lists of text lines"""
+
+    def _write_pdf(name: str, pages, encoding="WinAnsiEncoding") -> Path:
+        filename = tmp_path / name
+        filename.write_bytes(pdf_bytes(pages, encoding))
+        return filename
+
+    return _write_pdf
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import threading
+
+from bank_statement_reader import extraction, files2booking
+from bank_statement_reader.async_reader import afiles2booking, apdf2bookings
+from bank_statement_reader.cache import StatementCache
+from bank_statement_reader.extraction import EXTRACTORS, ExtractorSelector
+
+ROWS = [
+    ("02.01.2020", "REWE Markt", "Kartenzahlung\nREWE SAGT DANKE", "23,50", "S"),
+    ("03.01.2020", "Arbeitgeber", "Lohn/Gehalt/Rente\nGehalt Januar", "1.500,00", "H"),
+]
+
+
+def fake_pdftotext(tmp_path, text: str) -> str:
+    """An executable printing text, called like pdftotext"""
+    (tmp_path / "layout.txt").write_text(text, encoding="UTF-8")
+    script = tmp_path / "pdftotext"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        f"print(open({str(tmp_path / 'layout.txt')!r}, encoding='UTF-8').read())\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_apdf2bookings_uses_async_poppler(tmp_path, monkeypatch, statement_text):
+    monkeypatch.setattr(
+        extraction, "PDFTOTEXT", fake_pdftotext(tmp_path, statement_text)
+    )
+    monkeypatch.setitem(EXTRACTORS, "pdfminer", lambda path: "broken")
+    monkeypatch.setattr(
+        "bank_statement_reader.async_reader.pdf_fingerprint", lambda path: None
+    )
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+    selector = ExtractorSelector()
+
+    bookings = asyncio.run(apdf2bookings(statement, selector=selector))
+
+    assert [b.payee for b in bookings] == ["Arbeitgeber GmbH", "REWE"]
+    assert selector.fallbacks == {"pdfminer": 1}
+
+
+class ThreadRecordingCache(StatementCache):
+    """Note the threads the extractor choices are read and written in"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.threads = []
+
+    def get(self, key):
+        if key.startswith("extractor-"):
+            self.threads.append(threading.current_thread())
+        return super().get(key)
+
+    def put(self, key, data):
+        if key.startswith("extractor-"):
+            self.threads.append(threading.current_thread())
+        super().put(key, data)
+
+
+def test_apdf2bookings_selector_cache_off_the_loop(
+    tmp_path, monkeypatch, statement_text
+):
+    monkeypatch.setitem(EXTRACTORS, "pdfminer", lambda path: statement_text)
+    monkeypatch.setattr(
+        "bank_statement_reader.async_reader.pdf_fingerprint", lambda path: "abc"
+    )
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+    cache = ThreadRecordingCache(tmp_path / "cache")
+    selector = ExtractorSelector()
+
+    asyncio.run(apdf2bookings(statement, cache, selector=selector))
+
+    assert len(cache.threads) == 2
+    assert threading.main_thread() not in cache.threads
+    assert selector.known == {"abc": "pdfminer"}
+
+
+def test_afiles2booking_equals_files2booking(write_csv_statement, tmp_path):
+    files = [
+        write_csv_statement("a.csv", ROWS),
+        write_csv_statement("b.csv", ROWS[1:]),
+        tmp_path / "notes.txt",
+    ]
+    bookings = asyncio.run(afiles2booking(files, concurrency=1))
+    assert [str(b) for b in bookings] == [str(b) for b in files2booking(files)]
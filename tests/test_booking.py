@@ -0,0 +1,82 @@
+import pytest
+
+from bank_statement_reader import Booking
+from bank_statement_reader.booking.rules import EQUALS, CategoryRule
+
+
+@pytest.mark.parametrize(
+    "payee, comment, expected_payee, expected_category",
+    [
+        ("REWE Markt GmbH", "", "REWE", "Nahrung > Grocery"),
+        ("rewe markt", "", "REWE", "Nahrung > Grocery"),
+        ("  OBI Baumarkt", "", "OBI", "Unknown"),
+        ("Filiale FRISCHEMARKT Nord", "", "EDEKA", "Nahrung > Grocery"),
+        ("PayPal Europe", "Spotify Premium", "Spotify", "Leisures > Music"),
+        ("PayPal Europe", "Einkauf", "PayPal", "Anschaffungen > Sonstiges"),
+        ("DM Fil. 123", "", "DM", "Care > Careproducts"),
+        ("Ingenico", "ROSSMANN SAGT DANKE", "Rossmann", "Care > Careproducts"),
+        ("Stern-Apotheke", "", "Stern-Apotheke", "Health > Chemist"),
+        ("Hausverwaltung", "Miete Mai", "Hausverwaltung", "Miete"),
+        ("Max Mustermann", "Geschenk", "Max Mustermann", "Unknown"),
+    ],
+)
+def test_payee_and_category_rules(
+    make_booking, payee, comment, expected_payee, expected_category
+):
+    booking = make_booking(payee=payee, comment=comment)
+    assert booking.payee == expected_payee
+    assert booking.category == expected_category
+
+
+def test_category_rule_can_change_type(make_booking):
+    booking = make_booking(payee="GLS Bank", comment="GLS Beitrag 2020")
+    assert booking.category == "Financial expenses > Bank charges"
+    assert booking.type == "Kontogebühren"
+
+
+def test_custom_rules_of_subclass_take_precedence(make_booking):
+    class PersonalBooking(Booking):
+        payee_prefixes = ["Bäckerei"] + Booking.payee_prefixes
+        category_rules = [
+            CategoryRule("payee", EQUALS, "Bäckerei", "Nahrung > Bakery"),
+            CategoryRule("payee", EQUALS, "REWE", "Nahrung > Supermarket"),
+        ] + Booking.category_rules
+
+    booking = PersonalBooking()
+    booking.type = "Lastschrift"
+    booking.payee = "Bäckerei Schmidt"
+    assert booking.payee == "Bäckerei"
+    assert booking.category == "Nahrung > Bakery"
+    booking.payee = "REWE"
+    assert booking.category == "Nahrung > Supermarket"
+    # the rules of the base class are not affected
+    assert make_booking(payee="REWE").category == "Nahrung > Grocery"
+    assert PersonalBooking.rules_fingerprint() != Booking.rules_fingerprint()
+
+
+def test_category_is_cached_until_fields_change(make_booking):
+    class CountingBooking(Booking):
+        calls = 0
+
+        def _get_category(self) -> str:
+            CountingBooking.calls += 1
+            return super()._get_category()
+
+    booking = CountingBooking()
+    booking.type = "Lastschrift"
+    booking.amount = -10.0
+    booking.comment = "Einkauf"
+    booking.payee = "REWE Markt"
+    str(booking), repr(booking), booking._tr_
+    assert booking.category == "Nahrung > Grocery"
+    assert CountingBooking.calls == 1
+
+    booking.amount = -20.0
+    booking.date = "02.01.2020"
+    assert booking.category == "Nahrung > Grocery"
+    assert CountingBooking.calls == 1
+
+    booking.comment = "Miete Mai"
+    booking.payee = "Hausverwaltung"
+    assert booking.category == "Miete"
+    assert CountingBooking.calls == 2
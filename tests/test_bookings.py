@@ -0,0 +1,169 @@
+from datetime import date
+
+import pytest
+
+from bank_statement_reader import Bookings
+
+
+def test_bookings_are_kept_in_order(make_booking):
+    bookings = Bookings()
+    for day in (5, 1, 3, 2, 4):
+        bookings.append(make_booking(day=date(2020, 1, day), comment=f"Nr {day}"))
+    assert [b.date.day for b in bookings] == [1, 2, 3, 4, 5]
+    assert bookings.start_date == date(2020, 1, 1)
+    assert bookings.end_date == date(2020, 1, 5)
+
+
+def test_bookings_add_keeps_order(make_booking):
+    first = Bookings()
+    second = Bookings()
+    first.append(make_booking(day=date(2020, 1, 3)))
+    second.append(make_booking(day=date(2020, 1, 1)))
+    second.append(make_booking(day=date(2020, 1, 3)))
+    result = first + second
+    assert [b.date.day for b in result] == [1, 3]
+
+
+def test_bookings_same_day_use_natural_order(make_booking):
+    bookings = Bookings()
+    bookings.append(make_booking(payee="Payee 10"))
+    bookings.append(make_booking(payee="Payee 9"))
+    bookings.append(make_booking(payee="Payee 9", comment="Rechnung 10"))
+    bookings.append(make_booking(payee="Payee 9", comment="Rechnung 2"))
+    assert [(b.payee, b.comment) for b in bookings] == [
+        ("Payee 9", "Rechnung 1"),
+        ("Payee 9", "Rechnung 2"),
+        ("Payee 9", "Rechnung 10"),
+        ("Payee 10", "Rechnung 1"),
+    ]
+    assert list(bookings) == sorted(bookings)
+
+
+def test_bookings_ignore_duplicates(make_booking, caplog):
+    bookings = Bookings()
+    bookings.append(make_booking(comment="Rechnung 1 - Mai"))
+    bookings.append(make_booking(comment="rechnung_1\nmai"))
+    bookings.append(make_booking(comment="Rechnung 2"))
+    bookings.append(make_booking(comment="Rechnung 1 - Mai"), ignore_duplicates=False)
+    assert len(bookings) == 3
+    assert "as duplicate of" in caplog.text
+
+
+def test_bookings_ignore_possible_duplicates(make_booking, monkeypatch):
+    monkeypatch.setattr(Bookings, "STRICT_COMPARING", False)
+    bookings = Bookings()
+    bookings.append(make_booking(comment="Rechnung 1"))
+    bookings.append(make_booking(comment="Rechnung 2"))
+    bookings.append(make_booking(amount=-20.0, comment="Rechnung 2"))
+    assert [b.comment for b in bookings] == ["Rechnung 1", "Rechnung 2"]
+
+
+def test_bookings_merge(make_booking):
+    first = Bookings()
+    second = Bookings()
+    for day in (1, 3, 5):
+        first.append(make_booking(day=date(2020, 1, day)))
+    for day in (2, 3, 4):
+        second.append(make_booking(day=date(2020, 1, day)))
+    unsorted = [make_booking(day=date(2020, 1, 6)), make_booking(day=date(2020, 1, 1))]
+    result = Bookings.merge(first, second, unsorted)
+    assert [b.date.day for b in result] == [1, 2, 3, 4, 5, 6]
+    assert len(first) == 3
+
+
+def test_bookings_iadd_in_place(make_booking):
+    bookings = Bookings()
+    same = bookings
+    bookings.append(make_booking(day=date(2020, 1, 2)))
+    other = Bookings()
+    other.append(make_booking(day=date(2020, 1, 1)))
+    bookings += other
+    assert bookings is same
+    assert [b.date.day for b in bookings] == [1, 2]
+    bookings.append(make_booking(day=date(2020, 1, 3)))
+    assert [b.date.day for b in bookings] == [1, 2, 3]
+
+
+def test_bookings_between(make_booking):
+    bookings = Bookings()
+    for day in (1, 2, 2, 3, 5):
+        bookings.append(make_booking(day=date(2020, 1, day), comment=f"{day}"))
+    result = bookings.between(date(2020, 1, 2), date(2020, 1, 4))
+    assert isinstance(result, Bookings)
+    assert [b.date.day for b in result] == [2, 3]
+    assert [b.date.day for b in bookings.between(end_date=date(2020, 1, 2))] == [1, 2]
+    assert len(bookings.between(date(2020, 1, 6))) == 0
+
+
+def _bookings(make_booking, count: int) -> Bookings:
+    bookings = Bookings()
+    for number in range(count):
+        bookings.append(make_booking(comment=f"Rechnung {number}"))
+    return bookings
+
+
+def test_bookings_repr_shows_first_rows(make_booking, monkeypatch):
+    monkeypatch.setattr(Bookings, "DISPLAY_ROWS", 2)
+    bookings = _bookings(make_booking, 2)
+    html = bookings._repr_html_()
+    assert html == bookings.html_filter_entry_without_category(False)
+    assert html.count("<tr>") == 3 and "more bookings" not in html
+
+    bookings.append(make_booking(comment="Rechnung 2"))
+    assert bookings._repr_html_().count("<tr>") == 3
+    assert "Bookings 1 to 2 of 3 (page 1 of 2)" in bookings._repr_html_()
+    assert repr(bookings).endswith("  … 1 more bookings\n]")
+    table = bookings.html_filter_entry_without_category(False, max_rows=1)
+    assert "… 2 more bookings" in table
+
+
+def test_bookings_page(make_booking):
+    bookings = _bookings(make_booking, 5)
+    page = bookings.page(2, size=2)
+    assert len(page) == 1
+    assert "Rechnung 4" in page._repr_html_()
+    assert "Rechnung 3" not in page._repr_html_()
+    assert "Bookings 5 to 5 of 5 (page 3 of 3)" in repr(page)
+    assert len(bookings.page(3, size=2)) == 0
+    with pytest.raises(ValueError):
+        bookings.page(0, size=0)
+
+
+def test_bookings_list_methods_keep_order_and_indices(make_booking):
+    bookings = Bookings()
+    for day in (1, 2, 3):
+        bookings.append(make_booking(day=date(2020, 1, day)))
+    first = bookings.pop(0)
+    assert first.date.day == 1
+    bookings.append(make_booking(day=date(2020, 1, 2), comment="Rechnung 2"))
+    assert [b.date.day for b in bookings] == [2, 2, 3]
+    day = date(2020, 1, 2)
+    assert [b.date.day for b in bookings.between(day, day)] == [2, 2]
+    # the booking removed is no duplicate anymore
+    bookings.append(make_booking(day=date(2020, 1, 1)))
+    assert len(bookings) == 4
+    bookings.remove(bookings[0])
+    del bookings[-1]
+    assert [b.comment for b in bookings] == ["Rechnung 1", "Rechnung 2"]
+    bookings.append(make_booking(day=date(2020, 1, 3)))
+    assert len(bookings) == 3
+    with pytest.raises(TypeError):
+        bookings.insert(0, first)
+    with pytest.raises(TypeError):
+        bookings[0] = first
+    with pytest.raises(TypeError):
+        bookings.reverse()
+    bookings.clear()
+    bookings.append(first)
+    assert list(bookings) == [first]
+
+
+def test_bookings_settle_type_changes_before_sorting(make_booking):
+    charges = make_booking(day=date(2020, 1, 2), payee=" ", comment="GLS Beitrag")
+    bookings = Bookings()
+    bookings.append(make_booking(day=date(2020, 1, 2), payee="Max"))
+    bookings.append(charges)
+    assert charges.type == "Kontogebühren"
+    assert charges.payee == "GLS Bank"
+    assert bookings._keys == [b.sort_key for b in bookings]
+    assert list(bookings) == sorted(bookings)
@@ -0,0 +1,159 @@
+import json
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from bank_statement_reader import (
+    Booking,
+    Bookings,
+    StatementCache,
+    extraction,
+    statement_reader,
+)
+
+
+def test_cache_is_content_addressed(tmp_path):
+    cache = StatementCache(tmp_path / "cache")
+    first = tmp_path / "first.pdf"
+    second = tmp_path / "second.pdf"
+    first.write_bytes(b"same content")
+    second.write_bytes(b"same content")
+    assert cache.get(cache.key(first, "poppler")) is None
+    cache.put(cache.key(first, "poppler"), b"text")
+    assert cache.get(cache.key(second, "poppler")) == b"text"
+    assert cache.get(cache.key(second, "pdfminer")) is None
+    cache.clear()
+    assert cache.get(cache.key(first, "poppler")) is None
+
+
+def test_cache_is_private(tmp_path):
+    cache = StatementCache(tmp_path / "cache")
+    cache.put("key", b"statement text")
+    assert (tmp_path / "cache").stat().st_mode & 0o777 == 0o700
+    assert (tmp_path / "cache" / "key").stat().st_mode & 0o777 == 0o600
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = StatementCache(tmp_path, max_size=10)
+    cache.put("old", b"12345")
+    cache.put("used", b"12345")
+    os.utime(tmp_path / "old", ns=(0, 0))
+    os.utime(tmp_path / "used", ns=(1, 1))
+    assert cache.get("used") == b"12345"
+    cache.put("new", b"12345")
+    assert cache.get("old") is None
+    assert cache.get("used") == b"12345"
+    assert cache.get("new") == b"12345"
+
+
+def test_cached_text_is_not_extracted_again(tmp_path, monkeypatch):
+    calls = []
+
+    def extract(filepath):
+        calls.append(filepath)
+        return "line\n" * 20
+
+    monkeypatch.setitem(extraction.EXTRACTORS, "pdfminer", extract)
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+    cache = StatementCache(tmp_path / "cache")
+    first = statement_reader.get_pdf_text_with_layout(statement, cache=cache)
+    second = statement_reader.get_pdf_text_with_layout(statement, cache=cache)
+    assert first == second
+    assert calls == [statement]
+
+
+def test_cached_booking_pages_depend_on_the_reader(tmp_path, monkeypatch):
+    scans = []
+    monkeypatch.setattr(
+        extraction, "booking_pages", lambda filepath: scans.append(filepath) or [1]
+    )
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+    cache = StatementCache(tmp_path / "cache")
+    assert extraction.booking_pages_cached(statement, cache) == [1]
+    assert extraction.booking_pages_cached(statement, cache) == [1]
+    assert len(scans) == 1
+    monkeypatch.setattr(statement_reader, "reader_fingerprint", lambda: "changed")
+    assert extraction.booking_pages_cached(statement, cache) == [1]
+    assert len(scans) == 2
+    assert "extraction" in statement_reader.READER_MODULES
+
+
+def test_cached_bookings_are_not_read_again(tmp_path, monkeypatch, make_booking):
+    statement = tmp_path / "statement.csv"
+    statement.write_bytes(b"data")
+    cache = StatementCache(tmp_path / "cache")
+    bookings = Bookings()
+    bookings.append(make_booking())
+    reads = []
+
+    def read(filepath):
+        reads.append(filepath)
+        return bookings
+
+    first = statement_reader.cached_bookings(statement, cache, read)
+    second = statement_reader.cached_bookings(statement, cache, read)
+    assert [str(b) for b in second] == [str(b) for b in first]
+    assert isinstance(second, Bookings)
+    assert len(reads) == 1
+
+    monkeypatch.setattr(Booking, "rules_version", "changed")
+    statement_reader.cached_bookings(statement, cache, read)
+    assert len(reads) == 2
+
+    monkeypatch.setattr(statement_reader, "reader_fingerprint", lambda: "changed")
+    statement_reader.cached_bookings(statement, cache, read)
+    assert len(reads) == 3
+
+
+def test_cached_bookings_are_stored_as_json(tmp_path, make_booking):
+    statement = tmp_path / "statement.csv"
+    statement.write_bytes(b"data")
+    cache = StatementCache(tmp_path / "cache")
+    bookings = Bookings()
+    bookings.append(make_booking())
+    statement_reader.cached_bookings(statement, cache, lambda path: bookings)
+    (entry,) = (tmp_path / "cache").iterdir()
+    assert json.loads(entry.read_text(encoding="UTF-8"))["comments"] == ["Rechnung 1"]
+
+    # entries that are no JSON records are read again instead of being loaded
+    entry.write_bytes(pickle.dumps(bookings))
+    reads = []
+    statement_reader.cached_bookings(
+        statement, cache, lambda path: reads.append(path) or bookings
+    )
+    assert reads == [statement]
+
+
+def test_cache_scans_directory_once(tmp_path, monkeypatch):
+    cache = StatementCache(tmp_path, max_size=100)
+    cache.put("existing", b"x" * 50)
+    cache = StatementCache(tmp_path, max_size=100)
+    scans = []
+    entries = StatementCache._entries
+    monkeypatch.setattr(
+        StatementCache, "_entries", lambda self: scans.append(1) or entries(self)
+    )
+    for number in range(20):
+        cache.put(f"entry{number}", b"x" * 10)
+    assert len(scans) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"entry{number}" for number in range(10, 20)
+    )
+
+
+def test_cache_can_be_shared_by_threads(tmp_path):
+    cache = StatementCache(tmp_path, max_size=200)
+
+    def use(worker):
+        for number in range(50):
+            cache.put(f"entry{worker}-{number % 7}", b"x" * 10)
+            cache.get(f"entry{(worker + 1) % 8}-{number % 7}")
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(use, range(8)))
+    sizes = {path.name: path.stat().st_size for path in tmp_path.iterdir()}
+    assert dict(cache._sizes) == sizes
+    assert cache._total == sum(sizes.values()) <= 200
+    assert pickle.loads(pickle.dumps(cache)).get(next(iter(sizes))) == b"x" * 10
@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+
+from bank_statement_reader import Bookings
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def bookings(make_booking):
+    bookings = Bookings()
+    bookings.append(make_booking(day=date(2020, 1, 2), amount=-0.1, payee="REWE"))
+    bookings.append(make_booking(day=date(2020, 1, 3), amount=-0.2, payee="REWE"))
+    bookings.append(make_booking(day=date(2020, 2, 1), amount=1000.0, payee="Firma"))
+    return bookings
+
+
+def test_columns_aggregations(bookings):
+    columns = bookings.to_columns()
+    assert len(columns) == 3
+    assert columns.sum() == 999.7
+    assert columns.sum_by_payee() == {"REWE": -0.3, "Firma": 1000.0}
+    assert columns.sum_by_category() == pytest.approx(bookings.sum_by_category())
+    assert columns.sum_by("month") == {"2020-01": -0.3, "2020-02": 1000.0}
+    with pytest.raises(ValueError):
+        columns.sum_by("comment")
+
+
+def test_columns_round_trip(bookings):
+    result = Bookings.from_columns(bookings.to_columns())
+    assert [str(b) for b in result] == [str(b) for b in bookings]
@@ -0,0 +1,90 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from bank_statement_reader import extraction
+from bank_statement_reader.extraction import (
+    ExtractorSelector,
+    booking_pages,
+    extract_text_cached,
+    extract_text_parallel,
+    page_ranges,
+    pdf_page_count,
+)
+
+
+def test_page_ranges():
+    assert page_ranges(3, 4) == [(0, 3)]
+    assert page_ranges(10, 2) == [(0, 5), (5, 10)]
+    assert page_ranges(10, 3) == [(0, 4), (4, 8), (8, 10)]
+
+
+def test_parallel_extraction_equals_single_pass(write_pdf, monkeypatch):
+    pdf = write_pdf(
+        "long.pdf",
+        [[f"Seite {page} Zeile {line}" for line in range(3)] for page in range(7)],
+    )
+    monkeypatch.setattr(extraction, "MIN_PAGES_PER_WORKER", 1)
+    assert pdf_page_count(pdf) == 7
+    single = extraction.EXTRACTORS["pdfminer"](pdf)
+    assert "Seite 6 Zeile 2" in single
+    assert extract_text_parallel(pdf, "pdfminer", workers=3) == single
+
+
+COVER = ["Kontoauszug", "Max Mustermann"]
+BOOKINGS = ["erstellt am 05.02.2020", "02.01. 01.01. Gutschrift 1.000,00 H"]
+APPENDIX = ["Anlage zum Kontoauszug", "Entgelte im Jahr 2020: 12,00 EUR"]
+
+
+def test_booking_pages_skips_pages_without_bookings(write_pdf, monkeypatch):
+    monkeypatch.setattr(extraction, "PRESCAN_MIN_PAGES", 4)
+    pages = [COVER, BOOKINGS, APPENDIX, BOOKINGS[1:], APPENDIX, APPENDIX]
+    pdf = write_pdf("statement.pdf", pages)
+    # the pages after booking pages are kept, they might continue a booking
+    assert booking_pages(pdf) == [1, 2, 3, 4]
+    text = extract_text_cached(pdf, "pdfminer", pages=[1, 2, 3, 4])
+    assert "Max Mustermann" not in text
+    assert text.count("Gutschrift") == 2
+    assert text.count("Anlage") == 2
+
+
+def test_booking_pages_keeps_all_pages_if_none_can_be_skipped(write_pdf, monkeypatch):
+    monkeypatch.setattr(extraction, "PRESCAN_MIN_PAGES", 1)
+    assert booking_pages(write_pdf("statement.pdf", [BOOKINGS, BOOKINGS])) is None
+    assert booking_pages(write_pdf("empty.pdf", [COVER])) is None
+
+
+def test_booking_pages_scans_only_long_statements(write_pdf, monkeypatch):
+    monkeypatch.setattr(extraction, "PRESCAN_MIN_PAGES", 5)
+    assert booking_pages(write_pdf("short.pdf", [COVER, BOOKINGS, APPENDIX])) is None
+    pdf = write_pdf("long.pdf", [COVER, BOOKINGS, APPENDIX, APPENDIX, BOOKINGS])
+    assert booking_pages(pdf) == [1, 2, 4]
+
+
+def test_booking_pages_keeps_all_pages_if_not_decodable(write_pdf, monkeypatch):
+    monkeypatch.setattr(extraction, "PRESCAN_MIN_PAGES", 1)
+    undecodable = ["Überweisung"]
+    # without an encoding of the font, pdfminer can't decode the Ü
+    pdf = write_pdf("statement.pdf", [COVER, BOOKINGS, undecodable, APPENDIX], None)
+    assert booking_pages(pdf) is None
+
+
+def test_booking_pages_finds_dates_split_into_strings(write_pdf, monkeypatch):
+    monkeypatch.setattr(extraction, "PRESCAN_MIN_PAGES", 1)
+    pdf = write_pdf("statement.pdf", [COVER, BOOKINGS, ["02.", "01.", "Miete"]])
+    assert booking_pages(pdf) == [1, 2]
+
+
+def test_selector_can_be_shared_by_threads():
+    selector = ExtractorSelector()
+
+    def use(number):
+        selector.order(f"font{number % 5}")
+        selector.succeeded(f"font{number % 5}", "poppler", number % 2 == 0)
+        selector.failed("pdfminer")
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(use, range(400)))
+    assert selector.hits == {"poppler": 200}
+    assert selector.fallbacks == {"pdfminer": 400}
+    copy = pickle.loads(pickle.dumps(selector))
+    assert copy.order("font1") == ("poppler", "pdfminer")
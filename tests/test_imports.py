@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+HEAVY = ("pdfminer", "schwifty", "natsort", "numpy")
+
+
+def imported_heavy_modules(code: str) -> str:
+    code += f"\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys\n{code}"],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    return result.stdout.decode().strip()
+
+
+def test_importing_loads_no_heavy_dependencies():
+    assert imported_heavy_modules("import bank_statement_reader.cli") == ""
+
+
+def test_reading_csv_does_not_load_pdfminer(write_csv_statement):
+    statement = write_csv_statement(
+        "jan.csv", [("02.01.2020", "REWE Markt", "Kartenzahlung\nDanke", "1,00", "S")]
+    )
+    code = (
+        "from bank_statement_reader import csv2bookings\n"
+        f"csv2bookings({str(statement)!r})"
+    )
+    # sorting the bookings needs natsort
+    assert imported_heavy_modules(code) == "natsort"
@@ -0,0 +1,96 @@
+import random
+import re
+from datetime import date
+
+import pytest
+
+from bank_statement_reader.exceptions import ParsingError
+from bank_statement_reader.parsing import (
+    join_lines,
+    normalise_type,
+    parse_amount_string,
+    parse_amounts,
+    parse_date,
+    parse_dates,
+    parse_german_number,
+)
+
+AMOUNTS = {
+    "1.000,00-": -1000.0,
+    "1.000,00   S": -1000.0,
+    "23,23+": 23.23,
+    "23,23     H": 23.23,
+}
+
+
+@pytest.mark.parametrize("amount, expected", AMOUNTS.items())
+def test_parse_amount_string(amount, expected):
+    assert parse_amount_string(amount) == expected
+
+
+def test_parse_date():
+    assert parse_date("31.12.2020") == date(2020, 12, 31)
+    assert parse_date("1.2.2020") == date(2020, 2, 1)
+    assert parse_german_number("1.234,56") == 1234.56
+    for invalid in ("30.02.2020", "2020-01-01"):
+        with pytest.raises(ParsingError):
+            parse_date(invalid)
+
+
+def test_parse_columns():
+    np = pytest.importorskip("numpy")
+    assert parse_amounts(list(AMOUNTS)).tolist() == list(AMOUNTS.values())
+    assert parse_amounts(["1.000,00", "2,50"], ["S", "H"]).tolist() == [-1000.0, 2.5]
+    expected = np.array(["2020-12-31", "2021-01-02"], dtype="datetime64[D]")
+    assert (parse_dates(["31.12.2020", "02.01.2021"]) == expected).all()
+    assert (parse_dates(["31.12.2020", "2.1.2021"]) == expected).all()
+    with pytest.raises(ParsingError):
+        parse_dates(["30.02.2020"])
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("Überweisungsauftrag", "Überweisungsauftrag"),
+        ("Lastschrift Wertstellung: 02.01.", "Lastschrift"),
+        ("Lastschrift PN: 931", "Lastschrift"),
+        ("Abschluss lt. Anlage 1", "Abschluss"),
+    ],
+)
+def test_normalise_type(value, expected):
+    assert normalise_type(value) == expected
+
+
+def test_normalise_type_counts_hits():
+    before = normalise_type.cache_info()
+    normalise_type("Gutschrift PN: 123")
+    normalise_type("Gutschrift PN: 123")
+    after = normalise_type.cache_info()
+    assert after.hits - before.hits >= 1
+
+
+def test_join_lines_equals_appending_line_by_line():
+    rnd = random.Random(0)
+    for _ in range(1000):
+        lines = [
+            "".join(rnd.choice(" \tab") for _ in range(rnd.randrange(6)))
+            for _ in range(rnd.randrange(5))
+        ]
+        text = ""
+        for line in lines:
+            text = re.sub("[ ]+", " ", f"{text} {line}".strip())
+        assert join_lines(lines) == text
+
+
+def test_parse_amounts_empty_and_invalid():
+    np = pytest.importorskip("numpy")
+    empty = parse_amounts([])
+    assert empty.dtype == np.float64 and empty.shape == (0,)
+    assert parse_amounts([], []).shape == (0,)
+    for invalid in ([""], ["1,00 S", "abc H"], ["1,00 S", "  "]):
+        with pytest.raises(ParsingError, match="Could not parse amount"):
+            parse_amounts(invalid)
+    with pytest.raises(ParsingError, match="Could not parse amount '1,x'"):
+        parse_amounts(["2,00", "1,x"], ["S", "H"])
+    with pytest.raises(ParsingError):
+        parse_amounts(["2,00"], ["S", "H"])
@@ -0,0 +1,88 @@
+import json
+
+from bank_statement_reader import (
+    files2booking,
+    pdf2bookings,
+    profiling,
+    statement_reader,
+)
+from bank_statement_reader.cli import main
+from bank_statement_reader.extraction import EXTRACTORS, ExtractorSelector
+
+ROWS = [
+    ("02.01.2020", "REWE Markt", "Kartenzahlung\nREWE SAGT DANKE", "23,50", "S"),
+    ("03.01.2020", "Arbeitgeber", "Lohn/Gehalt/Rente\nGehalt Januar", "1.500,00", "H"),
+]
+
+
+def test_profiling_records_stages_per_file(write_csv_statement):
+    files = [write_csv_statement("a.csv", ROWS), write_csv_statement("b.csv", ROWS)]
+    calls = []
+    with profiling() as profile:
+        profile.callback = lambda *args: calls.append(args)
+        files2booking(files, workers=2)
+    assert profile.stages["csv"].calls == 2
+    assert profile.stages["csv"].items == 4
+    assert profile.stages["merge"].items == 2
+    # two bookings accepted per file, and by the final merge only from the first file
+    assert profile.stages["dedupe"].calls == 3
+    assert profile.stages["dedupe"].items == 6
+    assert profile.stages["sort"].items == 6
+    assert profile.files[str(files[0])]["csv"].items == 2
+    # stages of the worker processes are merged, but not reported to the callback
+    assert [call[0] for call in calls] == ["dedupe", "sort", "merge"]
+
+
+def test_profiling_records_extractor_fallbacks(tmp_path, monkeypatch, statement_text):
+    monkeypatch.setitem(EXTRACTORS, "pdfminer", lambda path: "broken")
+    monkeypatch.setitem(EXTRACTORS, "poppler", lambda path: statement_text)
+    monkeypatch.setattr(statement_reader, "pdf_fingerprint", lambda path: None)
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+
+    with profiling() as profile:
+        pdf2bookings(statement, selector=ExtractorSelector())
+
+    report = profile.to_dict()
+    assert report["extractors"]["used"] == {"poppler": 1}
+    assert report["extractors"]["fallbacks"] == 1
+    assert set(report["files"][str(statement)]) == {
+        "fingerprint",
+        "extract.pdfminer",
+        "extract.poppler",
+        "bookings",
+    }
+    assert report["stages"]["bookings"]["items"] == 2
+
+
+def test_cli_writes_profile(write_csv_statement, tmp_path):
+    statement = write_csv_statement("a.csv", ROWS)
+    main(
+        [
+            str(statement),
+            "--out",
+            str(tmp_path / "out.csv"),
+            "--profile",
+            str(tmp_path / "profile.json"),
+        ]
+    )
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert set(report["stages"]) == {"csv", "dedupe", "sort", "merge", "write_csv"}
+    assert report["stages"]["write_csv"]["items"] == 2
+
+
+def test_cli_caches_only_with_cache_dir(write_csv_statement, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "default"))
+    statement = write_csv_statement("a.csv", ROWS)
+    main([str(statement), "--out", str(tmp_path / "out.csv")])
+    assert not (tmp_path / "default").exists()
+    main(
+        [
+            str(statement),
+            "--out",
+            str(tmp_path / "out.csv"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+        ]
+    )
+    assert any((tmp_path / "cache").iterdir())
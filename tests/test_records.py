@@ -0,0 +1,77 @@
+import pickle
+from datetime import date
+
+import pytest
+
+from bank_statement_reader import Booking, BookingRecords, Bookings
+
+
+def test_records_round_trip(make_booking):
+    bookings = Bookings()
+    bookings.append(make_booking(day=date(2020, 1, 2), payee="REWE Markt"))
+    bookings.append(make_booking(day=date(2020, 1, 1), amount=1000.0))
+    records = bookings.to_records()
+    assert len(records) == 2
+    assert records[-1].payee == "REWE"
+    assert records[-1].category == "Nahrung > Grocery"
+    assert [str(b) for b in Bookings.from_records(records)] == [
+        str(b) for b in bookings
+    ]
+
+
+def test_records_share_strings(make_booking):
+    records = BookingRecords(
+        make_booking(day=date(2020, 1, day), payee=f"{'Max'} Mustermann")
+        for day in range(1, 4)
+    )
+    assert records[0].payee is records[2].payee
+    assert records._payee_labels.labels == ["Max Mustermann"]
+
+
+def test_slotted_bookings_are_picklable(make_booking):
+    booking = make_booking()
+    assert not hasattr(booking, "__dict__")
+    restored = pickle.loads(pickle.dumps(booking))
+    assert str(restored) == str(booking)
+
+
+def test_subclass_without_slots_can_add_attributes():
+    class PersonalBooking(Booking):
+        def _get_category(self) -> str:
+            self.seen = True
+            return super()._get_category()
+
+    booking = PersonalBooking()
+    booking.type = "Lastschrift"
+    booking.payee = "Max Mustermann"
+    assert booking.category == "Unknown"
+    assert booking.seen
+
+
+def test_records_json_round_trip(make_booking):
+    bookings = Bookings()
+    bookings.append(make_booking(day=date(2020, 1, 2), payee="REWE Markt"))
+    bookings.append(make_booking(comment="Miete\nJanuar", amount=0.1 + 0.2))
+    restored = BookingRecords.from_json(bookings.to_records().to_json())
+    assert [str(b) for b in restored] == [str(b) for b in bookings]
+    assert restored[0].amount == 0.1 + 0.2
+    for invalid in ("[]", '{"dates": [1]}', "pickle"):
+        with pytest.raises(ValueError):
+            BookingRecords.from_json(invalid)
+
+
+def _notebook_booking(category: str) -> type:
+    namespace = {"Booking": Booking}
+    source = (
+        "class NotebookBooking(Booking):\n"
+        "    def _get_category(self):\n"
+        f"        return {category!r}\n"
+    )
+    exec(compile(source, "<notebook cell>", "exec"), namespace)
+    return namespace["NotebookBooking"]
+
+
+def test_rules_fingerprint_covers_overridden_methods():
+    first, second = _notebook_booking("Food"), _notebook_booking("Rent")
+    assert first.rules_fingerprint() != Booking.rules_fingerprint()
+    assert first.rules_fingerprint() != second.rules_fingerprint()
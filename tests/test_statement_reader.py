@@ -0,0 +1,225 @@
+import asyncio
+
+import pytest
+
+from bank_statement_reader import (
+    csv2bookings,
+    extraction,
+    files2booking,
+    iter_booking_batches,
+    iter_bookings,
+    pdf2bookings,
+    statement_reader,
+    write_bookings_csv,
+)
+from bank_statement_reader.async_reader import afiles2booking
+from bank_statement_reader.exceptions import ParsingError
+from bank_statement_reader.extraction import (
+    EXTRACTORS,
+    PAGE_EXTRACTORS,
+    ExtractorSelector,
+)
+from bank_statement_reader.statement_reader import (
+    data2booking,
+    iter_booking_lines,
+    iter_csv_bookings,
+    iter_text_bookings,
+    pdf2data_and_year,
+)
+
+JANUARY = [
+    ("02.01.2020", "REWE Markt", "Kartenzahlung\nREWE SAGT DANKE", "23,50", "S"),
+    ("03.01.2020", "Arbeitgeber", "Lohn/Gehalt/Rente\nGehalt Januar", "1.500,00", "H"),
+]
+FEBRUARY = [
+    ("03.01.2020", "Arbeitgeber", "Lohn/Gehalt/Rente\nGehalt Januar", "1.500,00", "H"),
+    ("01.02.2020", "Vermieter", "Dauerauftrag\nMiete Februar", "700,00", "S"),
+]
+
+
+def test_csv2bookings(write_csv_statement):
+    bookings = csv2bookings(write_csv_statement("jan.csv", JANUARY))
+    assert [(str(b.date), b.type, b.amount, b.payee) for b in bookings] == [
+        ("2020-01-02", "EC-Kartenzahlung", -23.5, "REWE"),
+        ("2020-01-03", "Gehalt", 1500.0, "Arbeitgeber"),
+    ]
+    assert bookings[1].comment == "Gehalt Januar"
+
+
+def test_iter_csv_bookings_in_batches(write_csv_statement):
+    statement = write_csv_statement("statement.csv", JANUARY + FEBRUARY[1:])
+    batches = list(iter_booking_batches(iter_csv_bookings(statement), size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    streamed = [str(b) for batch in batches for b in batch]
+    assert streamed == [str(b) for b in csv2bookings(statement)]
+    with pytest.raises(ValueError):
+        next(iter_booking_batches(batches[0], size=0))
+
+
+def test_iter_csv_bookings_requires_columns(tmp_path):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("Buchungstag;Valuta;Betrag\n", encoding="latin-1")
+    with pytest.raises(ParsingError, match="Umsatz"):
+        list(iter_csv_bookings(statement))
+
+
+def test_files2booking(write_csv_statement, tmp_path):
+    files = [
+        write_csv_statement("feb.csv", FEBRUARY),
+        write_csv_statement("jan.csv", JANUARY),
+        tmp_path / "notes.txt",
+    ]
+    bookings = files2booking(files)
+    assert [b.payee for b in bookings] == ["REWE", "Arbeitgeber", "Vermieter"]
+    parallel = files2booking(files, workers=2)
+    assert [str(b) for b in parallel] == [str(b) for b in bookings]
+
+
+READERS = {
+    "files2booking": lambda files: files2booking(files),
+    "files2booking in workers": lambda files: files2booking(files, workers=2),
+    "iter_bookings": lambda files: list(iter_bookings(files)),
+    "afiles2booking": lambda files: asyncio.run(afiles2booking(files)),
+}
+
+
+@pytest.mark.parametrize("reader", READERS)
+def test_readers_name_failing_file(write_csv_statement, reader):
+    broken = write_csv_statement("broken.csv", [("32.01.2020", "X", "Y", "1,00", "S")])
+    with pytest.raises(ParsingError, match="Failed to read '.*broken.csv'"):
+        READERS[reader]([broken, broken])
+
+
+@pytest.mark.parametrize("reader", READERS)
+def test_readers_ignore_other_files(write_csv_statement, tmp_path, caplog, reader):
+    statement = write_csv_statement("jan.csv", JANUARY)
+    bookings = READERS[reader]([tmp_path / "notes.txt", statement])
+    assert len(bookings) == 2
+    assert "Ignoring" in caplog.text and "notes.txt" in caplog.text
+
+
+def test_pdf2bookings_remembers_working_extractor(
+    tmp_path, monkeypatch, statement_text
+):
+    calls = []
+
+    def extractor(name, text):
+        def extract(filepath):
+            calls.append(name)
+            return text
+
+        return extract
+
+    monkeypatch.setitem(EXTRACTORS, "pdfminer", extractor("pdfminer", "broken"))
+    monkeypatch.setitem(EXTRACTORS, "poppler", extractor("poppler", statement_text))
+    monkeypatch.setattr(statement_reader, "pdf_fingerprint", lambda path: "gls")
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+    selector = ExtractorSelector()
+
+    first = pdf2bookings(statement, selector=selector)
+    second = pdf2bookings(statement, selector=selector)
+
+    assert [b.payee for b in first] == ["Arbeitgeber GmbH", "REWE"]
+    assert [str(b) for b in second] == [str(b) for b in first]
+    assert calls == ["pdfminer", "poppler", "poppler"]
+    assert selector.fallbacks == {"pdfminer": 1}
+    assert selector.hits == {"poppler": 1}
+
+
+def test_pdf2bookings_prescan_keeps_continued_bookings(
+    write_pdf, tmp_path, monkeypatch
+):
+    layout = [
+        "Kontoauszug\nMax Mustermann",
+        "GLS Gemeinschaftsbank eG   erstellt am 05.02.2020\n"
+        "01.02. 01.02. Dauerauftrag                 1,00 S\n"
+        "               Vermieter\n"
+        "               Miete Februar",
+        "               Wohnung 3",
+        "Anlage zum Kontoauszug",
+        "Entgelte im Jahr 2020: 12,00 EUR",
+    ]
+
+    def extract(filepath, pages=None):
+        # the indented first line of a page continues the last booking before
+        return "\f".join(layout[page] for page in pages or range(len(layout)))
+
+    monkeypatch.setattr(extraction, "PRESCAN_MIN_PAGES", 1)
+    monkeypatch.setitem(EXTRACTORS, "pdfminer", extract)
+    monkeypatch.setitem(PAGE_EXTRACTORS, "pdfminer", extract)
+    statement = write_pdf("statement.pdf", [page.split("\n") for page in layout])
+    selector = ExtractorSelector()
+    selector.ORDER = ("pdfminer",)
+
+    with_prescan = pdf2bookings(statement, selector=selector, prescan=True)
+
+    assert [b.comment for b in with_prescan] == ["Miete Februar Wohnung 3"]
+    assert [str(b) for b in with_prescan] == [
+        str(b) for b in pdf2bookings(statement, selector=selector)
+    ]
+
+
+def test_pdf2bookings_skips_prescan_with_page_workers(
+    tmp_path, monkeypatch, statement_text
+):
+    def extract_text_cached(filepath, extractor, cache, page_workers, pages):
+        assert (page_workers, pages) == (2, None)
+        return statement_text
+
+    def booking_pages_cached(filepath, cache):
+        raise AssertionError("the pages must not be pre-scanned")
+
+    monkeypatch.setattr(statement_reader, "extract_text_cached", extract_text_cached)
+    monkeypatch.setattr(statement_reader, "booking_pages_cached", booking_pages_cached)
+    monkeypatch.setattr(statement_reader, "pdf_fingerprint", lambda path: None)
+    statement = tmp_path / "statement.pdf"
+    statement.write_bytes(b"%PDF")
+
+    bookings = pdf2bookings(statement, selector=ExtractorSelector(), page_workers=2)
+
+    assert [b.payee for b in bookings] == ["Arbeitgeber GmbH", "REWE"]
+
+
+def test_data2booking_does_not_modify_data(statement_text):
+    data, year = pdf2data_and_year(statement_text, "statement.pdf")
+    original = list(data)
+    bookings = data2booking(data, year)
+    assert data == original
+    assert [b.comment for b in bookings] == [
+        "Gehalt Januar 2020",
+        "REWE SAGT DANKE 12345",
+    ]
+
+
+def test_pdf2data_and_year_finds_lines_like_splitlines(statement_text):
+    text = statement_text.replace("\n", "\r\n").replace("03.01.  03", "\f03.01.  03")
+    data, year = pdf2data_and_year(text, "statement.pdf")
+    assert year == "2020"
+    assert data == [
+        "02.01.  01.01. Überweisungsgutschr.                                1.000,00 H",
+        "               Arbeitgeber GmbH",
+        "               Gehalt Januar",
+        "               2020",
+        "03.01.  03.01. Kartenzahlung girocard                                 23,50 S",
+        "               REWE Markt",
+        "               REWE SAGT DANKE 12345",
+    ]
+    assert list(iter_booking_lines(text)) == data
+
+
+def test_iter_text_bookings_equals_data2booking(statement_text):
+    text = statement_text.replace("Anlage zum", "01.03. Anlage zum")
+    data, year = pdf2data_and_year(text, "statement.pdf")
+    expected = [str(b) for b in data2booking(data, year)]
+    assert [str(b) for b in iter_text_bookings(text, year)] == expected
+    with pytest.raises(ParsingError, match="01.03. Summary"):
+        list(iter_text_bookings(text.replace("Anlage", "Summary"), year))
+
+
+def test_iter_bookings_streams_to_csv(write_csv_statement, tmp_path):
+    files = [write_csv_statement("jan.csv", JANUARY)]
+    streamed = tmp_path / "streamed.csv"
+    assert write_bookings_csv(iter_bookings(files), streamed) == 2
+    saved = files2booking(files).save(tmp_path / "saved.csv")
+    assert streamed.read_text(encoding="utf-8") == saved.read_text(encoding="utf-8")